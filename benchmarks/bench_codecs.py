@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Encoding and decoding time for every installed codec, in the format configs are saved in.
+
+Usage::
+
+    python -m benchmarks.bench_codecs [--sizes 100K,1M] [--shapes wide,deep] [--repeat 5]
+
+Reports the fastest codec, and whether it's the one ``codec='auto'`` picks.
+"""
+from __future__ import division, print_function
+
+import argparse
+from timeit import default_timer
+
+from json_config.codecs import AUTO, available_codecs, get_codec
+
+from .bench_suite import Config, make_data, parse_size
+
+OPTIONS = {'indent': Config.serializer_indent, 'sort_keys': Config.serializer_sort_keys,
+           'separators': Config.serializer_separators}
+
+
+def best_of(repeat, func, *args):
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        func(*args)
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def serialize_cold(repeat, name, data):
+    """:meth:`PrettyJSONMixin.serialize` of a config that was never serialized, so nothing is cached."""
+    configs = [Config(obj=data, codec=name) for _ in range(repeat)]
+    return best_of(1, lambda: [config.serialize() for config in configs]) / repeat
+
+
+def run(sizes, shapes, repeat):
+    totals = dict((name, 0) for name in available_codecs())
+    print('%-8s %-6s %-12s %10s %10s %13s' % ('size', 'shape', 'codec', 'dumps ms', 'loads ms', 'serialize ms'))
+
+    for size_name in sizes:
+        for shape in shapes:
+            data = make_data(parse_size(size_name), shape)
+            text = get_codec('json').dumps(data, **OPTIONS)
+
+            for name in available_codecs():
+                codec = get_codec(name)
+                assert codec.loads(codec.dumps(data, **OPTIONS)) == data
+
+                dumps = best_of(repeat, lambda: codec.dumps(data, **OPTIONS))
+                loads = best_of(repeat, codec.loads, text)
+                serialize = serialize_cold(repeat, name, data)
+                totals[name] += dumps + loads + serialize
+
+                print('%-8s %-6s %-12s %10.2f %10.2f %13.2f' % (
+                    size_name, shape, name, dumps * 1000, loads * 1000, serialize * 1000))
+
+    fastest = min(totals, key=totals.get)
+    print('\nfastest: %s, auto picks: %s' % (fastest, get_codec(AUTO).name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100K,1M')
+    parser.add_argument('--shapes', default='wide,deep')
+    parser.add_argument('--repeat', default=5, type=int)
+    args = parser.parse_args()
+
+    run(args.sizes.split(','), args.shapes.split(','), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Peak memory and time to load a large config, for each loader.
+
+Usage::
+
+    python -m benchmarks.bench_load [--size 100M] [--shape wide] [--loaders default,streaming,lazy,sections]
+
+Each loader runs in a fresh interpreter.  ``sections`` loads one section, through an index built beforehand.
+Requires a posix system (``resource``).
+"""
+from __future__ import division, print_function
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer
+
+from .bench_suite import make_data, parse_size
+
+LOADERS = {
+    'default': {},
+    'streaming': {'streaming': True},
+    'lazy': {'lazy': True},
+    'streaming+lazy': {'streaming': True, 'lazy': True},
+    'sections': {'sections': ['part_0']},
+}
+SECTION_BYTES = 1 << 20
+
+
+def write_config(path, size, shape):
+    """Write about `size` bytes of config, a section at a time, so the writer never holds it all."""
+    with open(path, 'w') as f:
+        f.write('{')
+        for i in range(max(1, size // SECTION_BYTES)):
+            if i:
+                f.write(', ')
+            section = make_data(min(size, SECTION_BYTES), shape, salt=i)
+            f.write('"part_%d": %s' % (i, json.dumps(section, indent=2)))
+        f.write('}')
+
+
+def max_rss():
+    """Peak resident set size of this process, in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def child(path, loader):
+    from json_config import connect
+
+    before = max_rss()
+    start = default_timer()
+    config = connect(path, **LOADERS[loader])
+    elapsed = default_timer() - start
+    print(json.dumps({'before': before, 'peak': max_rss(), 'seconds': elapsed, 'keys': len(config)}))
+
+
+def run(size_name, shape, loaders):
+    size = parse_size(size_name)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'config.json')
+        write_config(path, size, shape)
+        print('%s %s config, %.1f MB on disk' % (size_name, shape, os.path.getsize(path) / (1 << 20)))
+
+        if 'sections' in loaders:
+            # as a writer connected with `section_index=True` would.  Out of process: children inherit peak RSS.
+            subprocess.check_call([sys.executable, '-m', 'benchmarks.bench_load', '--index', path])
+        print('%-16s %12s %12s %10s' % ('loader', 'peak MB', 'added MB', 'seconds'))
+
+        for loader in loaders:
+            output = subprocess.check_output([sys.executable, '-m', 'benchmarks.bench_load', '--child', path, loader])
+            result = json.loads(output.decode().strip().splitlines()[-1])
+            print('%-16s %12.1f %12.1f %10.2f' % (loader, result['peak'] / (1 << 20),
+                                                  (result['peak'] - result['before']) / (1 << 20), result['seconds']))
+            sys.stdout.flush()
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', default='100M')
+    parser.add_argument('--shape', default='wide', choices=('wide', 'deep'))
+    parser.add_argument('--loaders', default='default,streaming,lazy,streaming+lazy,sections')
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'LOADER'), help=argparse.SUPPRESS)
+    parser.add_argument('--index', metavar='PATH', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+    elif args.index:
+        from json_config import connect
+        connect(args.index, sections=[])
+    else:
+        run(args.size, args.shape, args.loaders.split(','))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Memory held per node, for trees of small dicts.
+
+Usage::
+
+    python -m benchmarks.bench_memory [--nodes 20000]
+
+Requires Python 3.4+ (``tracemalloc``).
+"""
+from __future__ import division, print_function
+
+import argparse
+import gc
+import shutil
+import tempfile
+import tracemalloc
+
+import os
+
+from json_config import connect
+from json_config.main import AutoDict
+
+from .bench_suite import make_data
+
+
+def traced(build):
+    """Bytes still allocated by what `build()` returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return size
+
+
+def copy_dicts(data):
+    """Plain dicts shaped like `data`, sharing its leaves, like an :class:`AutoDict` built from it."""
+    return dict((key, copy_dicts(value) if isinstance(value, dict) else value) for key, value in data.items())
+
+
+def count_nodes(data):
+    return 1 + sum(count_nodes(value) for value in data.values() if isinstance(value, dict))
+
+
+def run(nodes):
+    # one node per 4 leaves, 10 levels deep
+    data = make_data(nodes * 4 * 32, 'deep')
+    n = count_nodes(data)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        config_file = os.path.join(tmpdir, 'config.json')
+        connect(config_file).update(data)
+
+        print('%d nodes' % n)
+        print('%-24s %14s' % ('tree', 'bytes/node'))
+
+        for name, build in [
+            ('dict', lambda: copy_dicts(data)),
+            ('AutoDict', lambda: AutoDict(obj=data)),
+            ('connect', lambda: connect(config_file)),
+            ('connect(lazy=True)', lambda: connect(config_file, lazy=True)),
+        ]:
+            print('%-24s %14.1f' % (name, traced(build) / n))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=20000)
+    args = parser.parse_args()
+
+    run(args.nodes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Save throughput for each write strategy.
+
+Usage::
+
+    python -m benchmarks.bench_save [--keys 1000] [--saves 200]
+"""
+from __future__ import print_function
+
+import argparse
+import shutil
+import tempfile
+from functools import partial
+from timeit import default_timer
+
+import os
+
+from json_config import connect
+from json_config.storage import FSYNC_POLICIES, write_atomic, write_in_place
+
+STRATEGIES = [('in-place', write_in_place, 'none')]
+STRATEGIES += [('atomic/%s' % policy, write_atomic, policy) for policy in FSYNC_POLICIES]
+
+
+def run(keys, saves):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        config = connect(os.path.join(tmpdir, 'config.json'))
+        with config.batch():
+            for i in range(keys):
+                config['section_%s' % (i % 10)]['key_%s' % i] = 'value %s' % i
+        data = config.serialize()
+
+        print('%d keys, %d bytes, %d saves per strategy' % (keys, len(data), saves))
+        print('%-20s %12s %12s' % ('strategy', 'saves/s', 'ms/save'))
+
+        for name, write_file, policy in STRATEGIES:
+            write = partial(write_file, config.config_file, data, policy)
+
+            start = default_timer()
+            for _ in range(saves):
+                write()
+            elapsed = default_timer() - start
+
+            print('%-20s %12.1f %12.3f' % (name, saves / elapsed, elapsed / saves * 1000))
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--keys', type=int, default=1000)
+    parser.add_argument('--saves', type=int, default=200)
+    args = parser.parse_args()
+
+    run(args.keys, args.saves)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Timings for the hot paths, on synthetic wide and deep configs.
+
+Usage::
+
+    python -m benchmarks.bench_suite [--sizes 1K,100K,1M] [--shapes wide,deep] [--only serialize,save]
+    python -m benchmarks.bench_suite --save benchmarks/baseline.json
+    python -m benchmarks.bench_suite --compare benchmarks/baseline.json [--threshold 1.5]
+
+``--compare`` exits non-zero when a timing regressed past the threshold.  Baselines are only comparable on the
+machine that recorded them; re-record one before comparing on new hardware.
+"""
+from __future__ import division, print_function
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from collections import OrderedDict
+from timeit import default_timer
+
+import os
+
+from json_config import connect
+from json_config.contracts import serializer_extensions
+from json_config.main import AutoDict, PrettyJSONMixin
+
+SIZES = OrderedDict([('K', 1 << 10), ('M', 1 << 20)])
+SHAPES = ('wide', 'deep')
+
+LEAF_BYTES = 32
+"""Roughly what each generated leaf adds to the serialized config."""
+DEEP_LEVELS = 10
+DEEP_FANOUT = 4
+DEEP_LEAVES = 8
+
+
+class Config(PrettyJSONMixin, AutoDict):
+    pass
+
+
+# DATA
+# ----------------------------------------------------------------------------
+def parse_size(size):
+    """``'100K'`` -> ``102400``"""
+    size = size.strip().upper()
+    if size[-1:] in SIZES:
+        return int(size[:-1]) * SIZES[size[-1]]
+    return int(size)
+
+
+def make_data(size, shape, salt=0):
+    """
+    A plain dict that serializes to about `size` bytes.
+
+    ``wide`` configs are sections of 100 keys each.  ``deep`` configs hang every group of leaves
+    :data:`DEEP_LEVELS` levels down.
+
+    :param salt: Changes every value, keeping the same keys.
+    :rtype: dict
+    """
+    data = {}
+    for i in range(max(1, size // LEAF_BYTES)):
+        value = i + salt
+        if shape == 'wide':
+            data.setdefault('section_%d' % (i // 100), {})['key_%d' % i] = value
+            continue
+
+        node, branch = data, i // DEEP_LEAVES
+        for _ in range(DEEP_LEVELS):
+            branch, digit = divmod(branch, DEEP_FANOUT)
+            node = node.setdefault('level_%d' % digit, {})
+        node['key_%d' % (i % DEEP_LEAVES)] = value
+    return data
+
+
+# BENCHMARKS
+# ----------------------------------------------------------------------------
+# Each takes the generated data, a scratch directory and an op count, and returns the seconds those ops took.
+def bench_construct(data, tmpdir, number):
+    start = default_timer()
+    for _ in range(number):
+        Config(obj=data)
+    return default_timer() - start
+
+
+def bench_deep_assign(data, tmpdir, number):
+    """Every op vivifies a new branch :data:`DEEP_LEVELS` levels deep."""
+    config = Config(obj=data)
+    keys = ['level_%d' % level for level in range(1, DEEP_LEVELS)]
+
+    start = default_timer()
+    for i in range(number):
+        node = config['new_%d' % i]
+        for key in keys:
+            node = node[key]
+        node['key'] = i
+    return default_timer() - start
+
+
+def bench_update(data, tmpdir, number):
+    config = Config(obj=data)
+    other = make_data(sum(1 for _ in _leaves(data)) * LEAF_BYTES, _shape(data), salt=1)
+
+    start = default_timer()
+    for i in range(number):
+        config.update(other if i % 2 == 0 else data)
+    return default_timer() - start
+
+
+def bench_serialize(data, tmpdir, number):
+    """One leaf changed between serializations, as between two saves."""
+    config = Config(obj=data)
+    config.serialize()
+    node, key = _first_leaf(config)
+
+    start = default_timer()
+    for i in range(number):
+        node[key] = 'changed %d' % i
+        config.serialize()
+    return default_timer() - start
+
+
+def bench_serialize_cold(data, tmpdir, number):
+    elapsed = 0
+    for _ in range(number):
+        config = Config(obj=data)
+
+        start = default_timer()
+        config.serialize()
+        elapsed += default_timer() - start
+    return elapsed
+
+
+def bench_connect(data, tmpdir, number):
+    """:func:`json_config.connect` for every registered file type."""
+    elapsed = 0
+    for ext in _serializer_exts():
+        config_file = os.path.join(tmpdir, 'config.%s' % ext)
+        config = connect(config_file)
+        config.update(data)
+
+        start = default_timer()
+        for _ in range(number):
+            connect(config_file)
+        elapsed += default_timer() - start
+    return elapsed
+
+
+def bench_connect_lazy(data, tmpdir, number):
+    """``connect(lazy=True)``, then read one leaf."""
+    config_file = os.path.join(tmpdir, 'config.json')
+    connect(config_file).update(data)
+
+    start = default_timer()
+    for _ in range(number):
+        _first_leaf(connect(config_file, lazy=True))
+    return default_timer() - start
+
+
+def bench_save(data, tmpdir, number):
+    config = connect(os.path.join(tmpdir, 'config.json'))
+    config.update(data)
+    node, key = _first_leaf(config)
+
+    start = default_timer()
+    for i in range(number):
+        node[key] = 'changed %d' % i
+    return default_timer() - start
+
+
+BENCHMARKS = OrderedDict([
+    ('construct', bench_construct),
+    ('deep_assign', bench_deep_assign),
+    ('update', bench_update),
+    ('serialize', bench_serialize),
+    ('serialize_cold', bench_serialize_cold),
+    ('connect', bench_connect),
+    ('connect_lazy', bench_connect_lazy),
+    ('save', bench_save),
+])
+
+
+def _leaves(data):
+    for value in data.values():
+        if isinstance(value, dict):
+            for leaf in _leaves(value):
+                yield leaf
+        else:
+            yield value
+
+
+def _shape(data):
+    return 'deep' if 'level_0' in data else 'wide'
+
+
+def _first_leaf(node):
+    while True:
+        key = sorted(node)[0]
+        if not isinstance(node[key], dict):
+            return node, key
+        node = node[key]
+
+
+def _serializer_exts():
+    return serializer_extensions()
+
+
+# RUNNER
+# ----------------------------------------------------------------------------
+def measure(bench, data, size, repeat):
+    """
+    Best seconds per op over `repeat` runs.  Small configs run many ops per run, so timer resolution doesn't
+    swamp them.
+    """
+    number = max(1, min(1000, (1 << 20) // size))
+    best = None
+    for _ in range(repeat):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            elapsed = bench(data, tmpdir, number) / number
+        finally:
+            shutil.rmtree(tmpdir)
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(sizes, shapes, names, repeat):
+    """:rtype: OrderedDict[str, float]"""
+    results = OrderedDict()
+    print('%-32s %14s' % ('benchmark', 'ms/op'))
+    for size_name in sizes:
+        size = parse_size(size_name)
+        for shape in shapes:
+            data = make_data(size, shape)
+            for name in names:
+                key = '%s/%s/%s' % (name, shape, size_name)
+                results[key] = measure(BENCHMARKS[name], data, size, repeat)
+                print('%-32s %14.4f' % (key, results[key] * 1000))
+                sys.stdout.flush()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print each timing against the baseline.
+
+    :return: The benchmarks slower than ``baseline * threshold``.
+    :rtype: list[str]
+    """
+    regressions = []
+    print('\n%-32s %14s %14s %8s' % ('benchmark', 'baseline ms', 'ms', 'ratio'))
+    for key, elapsed in results.items():
+        if key not in baseline:
+            continue
+
+        ratio = elapsed / baseline[key]
+        flag = ''
+        if ratio > threshold:
+            regressions.append(key)
+            flag = '  REGRESSED'
+        print('%-32s %14.4f %14.4f %8.2f%s' % (key, baseline[key] * 1000, elapsed * 1000, ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1K,100K,1M', help='comma separated, e.g. 1K,100K,10M,100M')
+    parser.add_argument('--shapes', default=','.join(SHAPES))
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help='comma separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', metavar='PATH', help='write the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results against a baseline')
+    parser.add_argument('--threshold', type=float, default=1.5, help='slowdown ratio that fails --compare')
+    args = parser.parse_args()
+
+    results = run(args.sizes.split(','), args.shapes.split(','), args.only.split(','), args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print('\n%d regressed past %.2fx: %s' % (len(regressions), args.threshold, ', '.join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Throughput of a shared config under 1, 4 and 16 threads.
+
+Usage::
+
+    python -m benchmarks.bench_threads [--ops 20000] [--threads 1 4 16]
+"""
+from __future__ import print_function
+
+import argparse
+import threading
+from timeit import default_timer
+
+from json_config.main import AutoDict, PrettyJSONMixin
+
+
+class Config(PrettyJSONMixin, AutoDict):
+    pass
+
+
+class SharedConfig(PrettyJSONMixin, AutoDict):
+    rwlock = True
+
+
+def writes(config, n, ops):
+    for i in range(ops):
+        config['thread_%s' % n]['key_%s' % (i % 100)] = i
+
+
+def locked_updates(config, n, ops):
+    for i in range(ops // 10):
+        with config.lock():
+            for j in range(10):
+                config['thread_%s' % n]['key_%s' % j] = i
+
+
+def reads(config, n, ops):
+    for _ in range(ops):
+        with config.read_lock():
+            config.get('section_%s' % (n % 10))
+
+
+WORKLOADS = [('writes', writes), ('locked updates', locked_updates), ('reads', reads)]
+
+
+def measure(cls, workload, threads, ops):
+    config = cls({'section_%s' % i: {'key_%s' % j: j for j in range(100)} for i in range(10)})
+    per_thread = ops // threads
+    workers = [threading.Thread(target=workload, args=(config, n, per_thread)) for n in range(threads)]
+
+    start = default_timer()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (default_timer() - start)
+
+
+def run(ops, thread_counts):
+    print('%d operations per run' % ops)
+    print('%-16s %-8s %s' % ('workload', 'lock', ''.join('%14s' % ('%d threads' % n) for n in thread_counts)))
+
+    for name, workload in WORKLOADS:
+        for lock_name, cls in (('mutex', Config), ('rwlock', SharedConfig)):
+            results = [measure(cls, workload, n, ops) for n in thread_counts]
+            print('%-16s %-8s %s' % (name, lock_name, ''.join('%12.0f/s' % result for result in results)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ops', type=int, default=20000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    run(args.ops, args.threads)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+How fast a change made by another process reaches watched configs, and what watching costs while idle.
+
+Usage::
+
+    python -m benchmarks.bench_watch [--configs 1,100] [--edits 20] [--idle 2]
+
+Idle CPU is the process's CPU time while nothing changes, as a share of wall time.
+"""
+from __future__ import division, print_function
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from timeit import default_timer
+
+from json_config.main import connect
+from json_config.watch import InotifyWatcher, PollingWatcher, _load_inotify
+
+
+def edit(path, version):
+    temp = path + '.swp'
+    with open(temp, 'w') as f:
+        json.dump({'version': version}, f)
+    os.rename(temp, path)
+
+
+def propagation(configs, path, edits):
+    """Seconds until every config sees each edit: the worst and the average."""
+    latencies = []
+    for version in range(1, edits + 1):
+        start = default_timer()
+        edit(path, version)
+        while any(config['version'] != version for config in configs):
+            time.sleep(0.001)
+        latencies.append(default_timer() - start)
+    return max(latencies), sum(latencies) / len(latencies)
+
+
+def idle_cpu(seconds):
+    start, cpu = default_timer(), time.process_time()
+    time.sleep(seconds)
+    return (time.process_time() - cpu) / (default_timer() - start)
+
+
+def run(counts, edits, idle):
+    watchers = [('polling', PollingWatcher)]
+    if _load_inotify() is not None:
+        watchers.insert(0, ('inotify', InotifyWatcher))
+
+    print('%-8s %8s %11s %11s %9s' % ('watcher', 'configs', 'worst ms', 'avg ms', 'idle cpu'))
+    for name, make_watcher in watchers:
+        for count in counts:
+            tmpdir = tempfile.mkdtemp()
+            watcher = make_watcher()
+            try:
+                paths = [os.path.join(tmpdir, 'config_%s.json' % i) for i in range(count)]
+                for path in paths:
+                    edit(path, 0)
+                configs = [connect(path, watch=watcher) for path in paths]
+
+                worst, average = propagation(configs[:1], paths[0], edits)
+                cpu = idle_cpu(idle)
+
+                print('%-8s %8d %11.2f %11.2f %8.2f%%' % (name, count, worst * 1000, average * 1000, cpu * 100))
+            finally:
+                watcher.close()
+                shutil.rmtree(tmpdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--configs', default='1,100')
+    parser.add_argument('--edits', default=20, type=int)
+    parser.add_argument('--idle', default=2, type=float)
+    args = parser.parse_args()
+
+    run([int(count) for count in args.configs.split(',')], args.edits, args.idle)
+
+
+if __name__ == '__main__':
+    main()
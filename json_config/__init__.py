@@ -25,6 +25,8 @@ __email__ = 'bionikspoon@gmail.com'
 __version__ = '2.0.1'
 
 import logging
+import sys
+
 from ._compat import NullHandler
 
 logging.getLogger(__name__).addHandler(NullHandler())
@@ -32,3 +34,8 @@ logging.getLogger(__name__).addHandler(NullHandler())
 from .main import connect
 
 __all__ = ['connect']
+
+if sys.version_info >= (3, 5):
+    from .aio import connect_async  # noqa
+
+    __all__.append('connect_async')
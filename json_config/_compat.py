@@ -5,7 +5,7 @@ import logging
 
 from future.utils import PY26, PY3, PYPY
 
-__all__ = ['NullHandler', 'FileNotFoundError']
+__all__ = ['NullHandler', 'FileNotFoundError', 'monotonic', 'replace', 'fcntl', 'Mapping', 'lru_cache']
 
 if not PY26 or PYPY:
     from logging import NullHandler
@@ -20,3 +20,51 @@ if PY3:
     from builtins import FileNotFoundError  # pragma: no cover
 else:
     FileNotFoundError = IOError  # pragma: no cover
+
+try:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from os import replace  # pragma: no cover
+except ImportError:
+    # Python < 3.3, atomic on posix.
+    from os import rename as replace  # pragma: no cover
+
+try:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from time import monotonic  # pragma: no cover
+except ImportError:
+    from time import time as monotonic  # pragma: no cover
+
+try:
+    import fcntl  # pragma: no cover
+except ImportError:
+    # Windows
+    fcntl = None  # pragma: no cover
+
+try:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from collections.abc import Mapping  # pragma: no cover
+except ImportError:
+    from collections import Mapping  # pragma: no cover
+
+try:
+    # noinspection PyUnresolvedReferences,PyCompatibility
+    from functools import lru_cache  # pragma: no cover
+except ImportError:
+    # Python < 3.2, a bounded memo that starts over when full.
+    def lru_cache(maxsize=128):  # pragma: no cover
+        def decorator(func):
+            cache = {}
+
+            def wrapper(arg):
+                try:
+                    return cache[arg]
+                except KeyError:
+                    if len(cache) >= maxsize:
+                        cache.clear()
+                    result = cache[arg] = func(arg)
+                    return result
+
+            wrapper.cache_clear = cache.clear
+            return wrapper
+
+        return decorator
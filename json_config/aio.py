@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+asyncio support.  Configs connected with :func:`connect_async` never block the event loop on file I/O.
+
+>>> config = await json_config.connect_async('config.json')  # doctest: +SKIP
+>>> config['root'] = '/var/www/html'                          # doctest: +SKIP
+>>> await config.flush()                                       # doctest: +SKIP
+"""
+import asyncio
+from functools import partial
+
+from .main import AutoConfigBase, AutoSyncMixin, _composed_classes, _find_serializer, write_atomic, write_in_place
+
+__all__ = ['connect_async', 'AsyncSaveMixin']
+
+# Python < 3.7, where get_event_loop() returns the running loop without complaint
+_get_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+# noinspection PyAbstractClass,PyProtectedMember
+class AsyncSaveMixin(AutoSyncMixin):
+    """
+    Write through an executor, scheduled on the event loop.
+
+    Saves made in the same loop iteration share one write.  Writes run one at a time, in order.  :meth:`save`
+    and :meth:`flush` return a future that resolves once the write reaches the disk.
+    """
+    executor = None
+    """:class:`concurrent.futures.Executor` to write with.  Defaults to the loop's executor."""
+
+    _loop_ = None
+    _scheduled_ = None
+    _in_flight_ = None
+
+    def __init__(self, **kwargs):
+        loop = kwargs.pop('loop', None)
+        executor = kwargs.pop('executor', None)
+
+        if executor is not None:
+            self.executor = executor
+
+        super(AsyncSaveMixin, self).__init__(**kwargs)
+
+        if loop is not None:
+            self._loop_ = loop
+
+        if self.journal or self.multiprocess or self.writer is not None:
+            raise ValueError('Async configs can not be combined with journal, multiprocess or background modes.')
+
+    def save(self):
+        super(AsyncSaveMixin, self).save()
+        return self._root._pending_write()
+
+    def flush(self, timeout=None):
+        root = self._root
+        super(AsyncSaveMixin, root).flush(timeout)
+        return root._pending_write()
+
+    def close(self, timeout=None):
+        return self.flush(timeout)
+
+    def _pending_write(self):
+        future = self._scheduled_ or self._in_flight_
+        if future is None:
+            future = self._loop.create_future()
+            future.set_result(None)
+        return future
+
+    @property
+    def _loop(self):
+        if self._loop_ is None:
+            try:
+                self._loop_ = _get_running_loop()
+            except RuntimeError:
+                # saved outside a running loop
+                self._loop_ = asyncio.get_event_loop_policy().get_event_loop()
+        return self._loop_
+
+    def _write(self):
+        loop = self._loop
+
+        if loop.is_closed():
+            # e.g. the exit hook, after the loop is gone
+            return super(AsyncSaveMixin, self)._write()
+
+        self._dirty_ = True
+        if self._scheduled_ is None:
+            self._scheduled_ = loop.create_future()
+            loop.call_soon_threadsafe(self._start_write)
+
+    def _start_write(self):
+        if self._in_flight_ is not None or self._scheduled_ is None:
+            # picked up when the write in flight finishes
+            return
+
+        future = self._in_flight_ = self._scheduled_
+        self._scheduled_ = None
+
+        with self._mutex:
+            data = self._snapshot_data()
+            self._mark_clean()
+
+        if data is None:
+            # the file already holds it
+            self._in_flight_ = None
+            future.set_result(None)
+            return self._start_write()
+
+        write_file = write_atomic if self.atomic_save else write_in_place
+        task = self._loop.run_in_executor(self.executor, self._write_file, write_file, data)
+        task.add_done_callback(partial(self._finish_write, future))
+
+    def _finish_write(self, future, task):
+        self._in_flight_ = None
+
+        error = task.exception()
+        if error is not None:
+            # stay dirty, so the next flush retries
+            self._fingerprint_ = self._written_cache_ = None
+            self._defer()
+            future.set_exception(error)
+        else:
+            self._disk_signature_ = task.result()
+            future.set_result(None)
+
+        self._start_write()
+
+
+# noinspection PyPep8Naming,PyAbstractClass
+async def connect_async(config_file, file_type=None, executor=None, **kwargs):
+    """Like :func:`json_config.connect`, but reads the file in an executor and returns an async config."""
+    loop = _get_running_loop()
+    Serializer = _find_serializer(config_file, file_type)
+
+    classes = _composed_classes(Serializer)
+    key = AsyncSaveMixin, AutoConfigBase
+    AsyncConnect = classes.get(key)
+    if AsyncConnect is None:
+        class AsyncConnect(AsyncSaveMixin, Serializer, AutoConfigBase):
+            pass
+        AsyncConnect = classes.setdefault(key, AsyncConnect)
+
+    make_config = partial(AsyncConnect, config_file=config_file, loop=loop, executor=executor, **kwargs)
+    return await loop.run_in_executor(executor, make_config)
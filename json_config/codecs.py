@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+JSON codecs for :class:`json_config.main.PrettyJSONMixin`.
+
+Each codec encodes and decodes like :mod:`json`, through a faster package when one is installed.  Whatever a
+backend can't reproduce (an indentation it doesn't support, integers past 64 bits, non-string keys, floats it
+writes differently) falls back to :mod:`json`, so switching codecs never changes the layout of a file.
+
+>>> codec = get_codec()
+>>> codec.dumps({'b': 1, 'a': [1, 2]}, indent=2, sort_keys=True, separators=(',', ': '))
+'{\\n  "a": [\\n    1,\\n    2\\n  ],\\n  "b": 1\\n}'
+"""
+import json
+import re
+
+try:
+    import orjson  # pragma: no cover
+except ImportError:
+    orjson = None  # pragma: no cover
+
+try:
+    import ujson  # pragma: no cover
+except ImportError:
+    ujson = None  # pragma: no cover
+
+try:
+    import simplejson  # pragma: no cover
+except ImportError:
+    simplejson = None  # pragma: no cover
+
+__all__ = ['AUTO', 'CODECS', 'Codec', 'get_codec', 'available_codecs']
+
+AUTO = 'auto'
+
+CODECS = ('orjson', 'ujson', 'simplejson', 'json')
+"""Every codec, fastest first.  :data:`AUTO` picks the first one installed."""
+
+_FORMAT_OPTIONS = frozenset(['indent', 'sort_keys', 'separators', 'ensure_ascii'])
+
+# orjson's exponent, as in 1e16 or 5e-324
+_ORJSON_EXPONENT_RE = re.compile(r'e[-0-9]')
+
+# Compared against json's output, once per format.  Keys out of order, nesting, empty containers, and the
+# control character that json_config.main uses in placeholders.
+_PROBE = {'b': [1, 2.5, {'c': None, 'd': True, 'e': False}], 'a': {'x': 'y\x00"\\', 'z': {}}, 'f': [], 'g': -3}
+
+
+class Codec(object):
+    """
+    Encode and decode JSON with :mod:`json`.  Subclasses speed it up with another package.
+
+    :meth:`dumps` takes the same options as :func:`json.dumps`, and returns the same text.
+    """
+    name = 'json'
+    module = json
+
+    def __init__(self):
+        self._formats = {}
+        """:type _formats: dict[tuple, bool]"""
+
+    def loads(self, string):
+        return json.loads(string)
+
+    def dumps(self, obj, **options):
+        return json.dumps(obj, **options)
+
+    def __repr__(self):
+        return '<%s codec>' % self.name
+
+
+class _BackendCodec(Codec):
+    """A codec that tries a backend first, and falls back to :mod:`json`."""
+
+    def loads(self, string):
+        try:
+            return self._loads(string)
+        except ValueError:
+            # NaN, Infinity, or not JSON at all: let json decide
+            return json.loads(string)
+
+    def dumps(self, obj, **options):
+        if self._supports(options):
+            try:
+                string = self._dumps(obj, options)
+            except (TypeError, ValueError, OverflowError):
+                # e.g. integers past 64 bits, or non-string keys
+                pass
+            else:
+                if not options.get('ensure_ascii', True) or _is_ascii(string):
+                    return string
+
+        return json.dumps(obj, **options)
+
+    def _supports(self, options):
+        """Can the backend write this format exactly like json does?  Probed once per format."""
+        if not _FORMAT_OPTIONS.issuperset(options):
+            return False
+
+        separators = options.get('separators')
+        key = (options.get('indent'), bool(options.get('sort_keys')), separators and tuple(separators),
+               options.get('ensure_ascii', True))
+        try:
+            return self._formats[key]
+        except KeyError:
+            pass
+
+        try:
+            is_supported = self._dumps(_PROBE, options) == json.dumps(_PROBE, **options)
+        except (TypeError, ValueError):
+            is_supported = False
+
+        self._formats[key] = is_supported
+        return is_supported
+
+    def _loads(self, string):
+        raise NotImplementedError  # pragma: no cover
+
+    def _dumps(self, obj, options):
+        raise NotImplementedError  # pragma: no cover
+
+
+class OrjsonCodec(_BackendCodec):
+    """
+    `orjson <https://github.com/ijl/orjson>`_: compact, or indented by 2 spaces.  orjson writes ``NaN`` and
+    ``Infinity`` as ``null``, and floats json writes in exponent form differently (``1e16`` for ``1e+16``,
+    ``0.00001`` for ``1e-05``), so documents holding those are encoded by json.
+
+    Decodes with json: orjson silently reads integers past 64 bits as floats, and ruling them out first costs
+    more than orjson saves.
+    """
+    name = 'orjson'
+    module = orjson
+
+    def loads(self, string):
+        return json.loads(string)
+
+    def _dumps(self, obj, options):
+        indent = options.get('indent')
+        if indent not in (None, 2):
+            raise ValueError('orjson only indents by 2 spaces')
+
+        option = orjson.OPT_INDENT_2 if indent else 0
+        if options.get('sort_keys'):
+            option |= orjson.OPT_SORT_KEYS
+        string = orjson.dumps(obj, option=option).decode('utf-8')
+
+        # Only look for such floats where the text could hold one: with an exponent, as 0.0000..., or (NaN and
+        # Infinity) as null.  Searching the text is much cheaper than walking obj.
+        is_suspect = 'null' in string or '0.0000' in string or _ORJSON_EXPONENT_RE.search(string)
+        if is_suspect and _has_unusual_floats(obj):
+            raise ValueError('orjson writes these floats differently')
+        return string
+
+
+class UjsonCodec(_BackendCodec):
+    """`ujson <https://github.com/ultrajson/ultrajson>`_."""
+    name = 'ujson'
+    module = ujson
+
+    def _loads(self, string):
+        return ujson.loads(string)
+
+    def _dumps(self, obj, options):
+        indent = options.get('indent')
+        if not isinstance(indent, (type(None), int)):
+            raise ValueError('ujson only indents by spaces')
+
+        return ujson.dumps(obj, indent=indent or 0, sort_keys=bool(options.get('sort_keys')),
+                           ensure_ascii=options.get('ensure_ascii', True), escape_forward_slashes=False)
+
+
+class SimplejsonCodec(_BackendCodec):
+    """`simplejson <https://github.com/simplejson/simplejson>`_, which takes the same options as json."""
+    name = 'simplejson'
+    module = simplejson
+
+    def _loads(self, string):
+        return simplejson.loads(string)
+
+    def _dumps(self, obj, options):
+        return simplejson.dumps(obj, **options)
+
+
+_CODEC_CLASSES = dict((cls.name, cls) for cls in (OrjsonCodec, UjsonCodec, SimplejsonCodec, Codec))
+_codecs = {}
+""":type _codecs: dict[str, Codec]"""
+
+
+def available_codecs():
+    """Names of the codecs that are installed, fastest first."""
+    return [name for name in CODECS if _CODEC_CLASSES[name].module is not None]
+
+
+def get_codec(name=AUTO):
+    """
+    The codec called `name`, one of :data:`CODECS`, or the fastest one installed for :data:`AUTO`.
+
+    :rtype: Codec
+    :raises ValueError: If there's no such codec.
+    :raises RuntimeError: If the codec's package isn't installed.
+    """
+    try:
+        return _codecs[name]
+    except KeyError:
+        pass
+
+    if name == AUTO:
+        codec = get_codec(available_codecs()[0])
+    elif name not in _CODEC_CLASSES:
+        raise ValueError('Unknown codec %r, expected one of %r' % (name, (AUTO,) + CODECS))
+    elif _CODEC_CLASSES[name].module is None:
+        raise RuntimeError('The %s codec requires the %s package, which is not installed.' % (name, name))
+    else:
+        codec = _CODEC_CLASSES[name]()
+
+    _codecs[name] = codec
+    return codec
+
+
+def _has_unusual_floats(obj):
+    """Does `obj` hold a float json writes as ``NaN``, ``Infinity`` or in exponent form?"""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        if type(value) is float:
+            # NaN fails every comparison
+            if value and not 1e-4 <= abs(value) < 1e16:
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def _is_ascii(string):
+    try:
+        return string.isascii()
+    except AttributeError:  # pragma: no cover
+        # Python < 3.7
+        try:
+            string.encode('ascii')
+        except UnicodeError:
+            return False
+        return True
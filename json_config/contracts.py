@@ -1,8 +1,11 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import weakref
 from abc import ABCMeta, abstractproperty, abstractmethod
-from future.utils import with_metaclass
+from threading import Lock
+
+from future.utils import string_types, with_metaclass
 
 
 class AbstractTraceRoot(with_metaclass(ABCMeta)):  # pragma: no cover
@@ -34,8 +37,56 @@ class AbstractTraceRoot(with_metaclass(ABCMeta)):  # pragma: no cover
         pass
 
 
-class AbstractSerializer(with_metaclass(ABCMeta)):  # pragma: no cover
+_serializers = {}
+""":type _serializers: dict[str, list[weakref.ref]]"""
+_serializers_lock = Lock()
+
+
+class SerializerMeta(ABCMeta):
+    """
+    Registers every serializer class under the extension it declares itself, nested subclasses too.  Classes
+    that only inherit `serializer_ext`, like the ones :func:`json_config.connect` composes, aren't registered.
+
+    The registry holds weak references, so classes that go away are forgotten.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super(SerializerMeta, cls).__init__(name, bases, namespace)
+
+        ext = namespace.get('serializer_ext')
+        if isinstance(ext, string_types):
+            with _serializers_lock:
+                _serializers.setdefault(ext, []).append(weakref.ref(cls))
+
+
+def find_serializer(ext):
+    """
+    The serializer class registered last for the file extension `ext`, such as ``'json'`` or ``'min.json'``.
+
+    :rtype: type|None
+    """
+    with _serializers_lock:
+        refs = _serializers.get(ext)
+        while refs:
+            cls = refs[-1]()
+            if cls is not None:
+                return cls
+            refs.pop()
+    return None
+
+
+def serializer_extensions():
+    """
+    Every extension some live serializer class is registered for.
+
+    :rtype: list[str]
+    """
+    return sorted(ext for ext in list(_serializers) if find_serializer(ext) is not None)
+
+
+class AbstractSerializer(with_metaclass(SerializerMeta)):  # pragma: no cover
     serializer_ext = NotImplemented
+    """File extension this serializer is used for, without the leading dot.  May be compound, like ``'min.json'``."""
 
     @abstractmethod
     def deserialize(self, string):
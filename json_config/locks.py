@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""Locks guarding a config tree.  Every node shares its root's lock."""
+import threading
+from contextlib import contextmanager
+
+__all__ = ['ReadWriteLock']
+
+
+class ReadWriteLock(object):
+    """
+    Re-entrant lock with a shared mode for readers.
+
+    Used as a context manager it's exclusive, like :class:`threading.RLock`.  :meth:`shared` lets any number of
+    readers in at once.  The writing thread may also read, but a reader can't upgrade to writing; that would
+    deadlock against another upgrading reader, so it raises instead.  Waiting writers hold off new readers.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = {}
+        self._writer = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+
+    def acquire(self):
+        me = threading.current_thread()
+
+        with self._cond:
+            if self._writer is me:
+                self._writer_depth += 1
+                return True
+
+            if me in self._readers:
+                raise RuntimeError('Can not upgrade a shared lock to an exclusive lock.')
+
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+
+            self._writer = me
+            self._writer_depth = 1
+            return True
+
+    def release(self):
+        with self._cond:
+            if self._writer is not threading.current_thread():
+                raise RuntimeError('Can not release un-acquired lock.')
+
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    __enter__ = acquire
+
+    def is_reading(self):
+        """Whether the current thread holds the lock shared, and not exclusively, so it can't :meth:`acquire` it."""
+        me = threading.current_thread()
+        return self._writer is not me and me in self._readers
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    @contextmanager
+    def shared(self):
+        me = threading.current_thread()
+
+        with self._cond:
+            # re-entrant readers and the writer itself go straight through
+            if self._writer is not me and me not in self._readers:
+                while self._writer is not None or self._writers_waiting:
+                    self._cond.wait()
+            self._readers[me] = self._readers.get(me, 0) + 1
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers[me] -= 1
+                if not self._readers[me]:
+                    del self._readers[me]
+                    self._cond.notify_all()
@@ -1,16 +1,57 @@
 #!/usr/bin/env python
 # coding=utf-8
+import atexit
 import json
+import logging
+import os
+import re
+import weakref
 from collections import defaultdict
 from contextlib import contextmanager
+from functools import wraps
+from random import SystemRandom
+from threading import RLock, Timer
 
-from ._compat import FileNotFoundError
-from .contracts import AbstractTraceRoot, AbstractSaveFile, AbstractSerializer
+from future.utils import integer_types, string_types
+
+from ._compat import FileNotFoundError, Mapping, lru_cache, monotonic
+from .codecs import AUTO, get_codec
+from .contracts import AbstractTraceRoot, AbstractSaveFile, AbstractSerializer, find_serializer
+from .locks import ReadWriteLock
+from .sections import index_text, read_index, read_members, scan_index, write_index
+from .streaming import load_into
+from .subscriptions import NotifyingMutex, SubscriptionIndex
+from .watch import default_watcher
+from .writer import default_writer
+from .storage import (FSYNC_NONE, FSYNC_POLICIES, append_journal, apply_changes, file_lock, file_signature,
+                      read_journal, remove_journal, stat_signature, write_atomic, write_in_place)
+
+logger = logging.getLogger(__name__)
+
+
+def synchronized(method):
+    """Run `method` holding the root's mutex, so other threads (such as the ``save_delay`` timer) never see a
+    half applied change."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._mutex:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 # noinspection PyProtectedMember
 class TraceRootMixin(AbstractTraceRoot):
+    rwlock = False
+    """Guard the tree with a :class:`json_config.locks.ReadWriteLock`, so :meth:`read_lock` holders share it."""
+
     _lock_ = None
+    _subscriptions_ = None
+    """:type _subscriptions_: json_config.subscriptions.SubscriptionIndex|None"""
+    _notices_ = None
+    """Paths changed since subscribers were last called.  :type _notices_: list[tuple]|None"""
+    _hold_depth_ = 0
 
     @property
     def _is_root(self):
@@ -18,28 +59,47 @@ class TraceRootMixin(AbstractTraceRoot):
 
     @property
     def _root(self):
-        return self._root_[0]
+        return self._root_
 
     @_root.setter
     def _root(self, value):
         if isinstance(value, (list, tuple)):
-            self._root_ = value
-        else:
-            self._root_ = [value]
+            value, = value
+        self._root_ = value
 
     @property
     def _parent(self):
         if self._is_root:
             return False
 
-        return self._parent_[0]
+        return self._parent_
 
     @_parent.setter
     def _parent(self, value):
         if isinstance(value, (list, tuple)):
-            self._parent_ = value
-        else:
-            self._parent_ = [value]
+            value, = value
+        self._parent_ = value
+
+    @property
+    def _path(self):
+        """Keys leading from the root to this node, or ``None`` while the node is detached."""
+        path = []
+        node = self
+        while not node._is_root:
+            parent = node._parent
+            if dict.get(parent, node._key) is not node:
+                return None
+            path.append(node._key)
+            node = parent
+
+        return tuple(reversed(path))
+
+    @property
+    def _mutex(self):
+        root = self._root
+        if root._subscriptions_ is None:
+            return root._mutex_
+        return NotifyingMutex(root)
 
     @property
     def _lock(self):
@@ -55,23 +115,57 @@ class TraceRootMixin(AbstractTraceRoot):
 
     @contextmanager
     def lock(self):
-        is_lock_owner = False
-        try:
-            if not self._is_locked:
-                self._lock = self
-                is_lock_owner = True
-            yield is_lock_owner
-        finally:
-            if is_lock_owner:
-                self._lock = None
+        """
+        Hold the tree for a group of changes.  Other threads wait, and only the outermost holder saves.
+
+        :return: Whether this is the outermost holder.
+        """
+        with self._mutex:
+            is_lock_owner = False
+            try:
+                if not self._is_locked:
+                    self._lock = self
+                    is_lock_owner = True
+                yield is_lock_owner
+            finally:
+                if is_lock_owner:
+                    self._lock = None
+
+    @contextmanager
+    def read_lock(self):
+        """
+        Hold the tree still while reading it.
+
+        With ``rwlock`` readers share the lock, otherwise this is the same as :meth:`lock`.  A reader must not
+        write: reading a missing key creates it, so use ``in`` or ``.get()`` inside.
+        """
+        mutex = self._root._mutex_
+        if isinstance(mutex, ReadWriteLock):
+            with mutex.shared():
+                yield
+        else:
+            with mutex:
+                yield
 
 
 class AutoDict(TraceRootMixin, defaultdict):
+    # Trees hold many small nodes, so per node state lives in slots.  Only roots, whose state is set on the
+    # instance (see AutoSyncMixin), grow a ``__dict__``.
+    __slots__ = ('_root_', '_parent_', '_key', '_cache_', '_frozen_', '_vivified_', '__dict__', '__weakref__')
+
     def __init__(self, obj=None, _root=None, _parent=None, _key=None):
         super(AutoDict, self).__init__()
 
+        self._cache_ = None
+        """:type _cache_: tuple|None"""
+        self._frozen_ = None
+        """:type _frozen_: FrozenConfig|None"""
+        self._vivified_ = False
+        """Created by reading a missing key.  Until something is stored under it, it's left out when saving."""
+
         if _root is None:
             self._root = self
+            self._mutex_ = ReadWriteLock() if self.rwlock else RLock()
         else:
             self._root = _root
 
@@ -82,23 +176,42 @@ class AutoDict(TraceRootMixin, defaultdict):
             with self.lock():
                 self.update(obj)
 
+    @synchronized
     def __missing__(self, key):
+        # another thread may have created it while we waited
+        if key in self:
+            return dict.__getitem__(self, key)
+
+        value = self._unloaded(key)
+        if value is not _MISSING:
+            return value
+
         _AutoDict = self.__class__
-        self[key] = value = _AutoDict(_root=self._root, _parent=self, _key=key)
+        value = _AutoDict(_root=self._root, _parent=self, _key=key)
+        value._vivified_ = True
+        super(AutoDict, self).__setitem__(key, value)
+        self._changed('vivify', key, value)
         return value
 
+    @synchronized
     def __setitem__(self, key, value):
-        _AutoDict = self.__class__
+        # assigning what's already there is a no-op, unless it's making a vivified node stick
+        old = dict.get(self, key, _MISSING)
+        if _is_same(old, value) and not (isinstance(old, AutoDict) and old._vivified_):
+            return
 
-        # convert dicts to AutoDicts
-        is_dict = not isinstance(value, _AutoDict) and isinstance(value, dict)
-        if is_dict:
-            value = _AutoDict(obj=value, _root=self._root, _parent=self, _key=key)
+        # convert dicts to AutoDicts, copy nodes attached elsewhere
+        is_node = isinstance(value, self.__class__) and value._parent is self and value._key == key
+        if not is_node and isinstance(value, dict):
+            value = _build_node(self, key, value)
 
         super(AutoDict, self).__setitem__(key, value)
+        self._changed('set', key, value)
 
+    @synchronized
     def __delitem__(self, key):
         super(AutoDict, self).__delitem__(key)
+        self._changed('del', key)
 
         if self._is_root:
             return self._root.save()
@@ -109,6 +222,7 @@ class AutoDict(TraceRootMixin, defaultdict):
             self._root.save()
 
     # noinspection PyPep8Naming
+    @synchronized
     def update(self, E=None, **F):
         """
         D.update(E, **F) -> None.  Update D from E and F: for k in E: D[k]
@@ -116,44 +230,329 @@ class AutoDict(TraceRootMixin, defaultdict):
         (if E has keys else: for (k, v) in E: D[k] = v) then: for k in
                 F: D[k] = F[k]
 
+        Nested dicts are built into nodes in one pass, and the tree saves once.
+
         :type E: dict
         :type F: dict
         """
-        _AutoDict = self.__class__
+        self._update(E, F, False)
 
-        def update_or_set(key, value):
-            if isinstance(value, dict):
-                self[key] = _AutoDict(obj=value, _root=self._root, _parent=self, _key=key)
-            else:
-                self[key] = value
+    # noinspection PyPep8Naming
+    @synchronized
+    def deep_update(self, E=None, **F):
+        """
+        D.deep_update(E, **F) -> None.  Like :meth:`update`, but nested dicts merge into the existing sections
+        instead of replacing them.
+
+        :type E: dict
+        :type F: dict
+        """
+        self._update(E, F, True)
 
+    # noinspection PyPep8Naming
+    def _update(self, E, F, deep):
         with self.lock() as lock_owner:
-            # update E
-            if hasattr(E, 'keys') and callable(E.keys):
-                for k in E:
-                    update_or_set(k, E[k])
-            else:
-                for k, v in E:
-                    update_or_set(k, v)
+            if E is not None:
+                _merge(self, E, deep)
+            _merge(self, F, deep)
 
-            # update F
-            for k in F:
-                update_or_set(k, F[k])
+            # save if original caller.
+            if lock_owner:
+                self._root.save()
+
+    # noinspection PyPep8Naming
+    @synchronized
+    def replace(self, E=None, **F):
+        """
+        D.replace(E, **F) -> None.  Replace D's contents with E and F, in one pass, saving once.
+
+        :type E: dict
+        :type F: dict
+        """
+        with self.lock() as lock_owner:
+            dict.clear(self)
+            if E is not None:
+                _fill(self, E)
+            _fill(self, F)
+            self._changed('replace')
 
             # save if original caller.
             if lock_owner:
                 self._root.save()
 
+    @synchronized
+    def clear(self):
+        super(AutoDict, self).clear()
+        self._changed('clear')
+
+    @synchronized
+    def pop(self, key, *default):
+        if key not in self:
+            return super(AutoDict, self).pop(key, *default)
+
+        value = super(AutoDict, self).pop(key)
+        self._changed('del', key)
+        return value
+
+    @synchronized
+    def popitem(self):
+        key, value = super(AutoDict, self).popitem()
+        self._changed('del', key)
+        return key, value
+
+    @synchronized
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def get_path(self, path, default=None):
+        """
+        Look up a value by its path, without creating missing nodes on the way.
+
+        >>> config.get_path('database.replica.host', 'localhost')  # doctest: +SKIP
+        >>> config.get_path(('hosts', 'example.com'))              # doctest: +SKIP
+
+        :param path: Dotted keys, or a sequence of keys for keys holding a dot.
+        :type path: str|tuple|list
+        :return: The value, or `default` if any key is missing.
+        """
+        node = self
+        for key in _parse_path(path):
+            if not isinstance(node, dict):
+                return default
+
+            value = dict.get(node, key, _MISSING)
+            if value is _MISSING:
+                return default
+            if type(value) is dict:
+                # a lazily loaded dict, hand out its node
+                value = node[key]
+            node = value
+
+        return node
+
+    def has_path(self, path):
+        """
+        Is there a value at `path`?  Creates nothing.  See :meth:`get_path`.
+
+        :type path: str|tuple|list
+        """
+        return self.get_path(path, _MISSING) is not _MISSING
+
+    @synchronized
+    def set_path(self, path, value):
+        """
+        Set the value at `path`, creating the sections on the way, and save once.  See :meth:`get_path`.
+
+        :type path: str|tuple|list
+        :raises TypeError: If a value that isn't a section sits on `path`.
+        """
+        keys = _parse_path(path)
+        if not keys:
+            raise ValueError('Can not set an empty path, use replace()')
+
+        with self.lock() as lock_owner:
+            node = self
+            for key in keys[:-1]:
+                child = dict.get(node, key, _MISSING)
+                if child is _MISSING:
+                    child = node._unloaded(key)
+                if type(child) is dict:
+                    # a lazily loaded dict
+                    child = node[key]
+                elif child is _MISSING:
+                    child = _build_node(node, key, {})
+                    dict.__setitem__(node, key, child)
+                    node._changed('set', key, child)
+                elif not isinstance(child, AutoDict):
+                    raise TypeError('%r holds a %s, not a section' % (key, type(child).__name__))
+                node = child
+
+            node[keys[-1]] = value
+
+            # save if original caller.
+            if lock_owner:
+                self._root.save()
+
+    @synchronized
+    def del_path(self, path):
+        """
+        Delete the value at `path`.  See :meth:`get_path`.
+
+        :type path: str|tuple|list
+        :raises KeyError: If there's nothing at `path`.
+        """
+        keys = _parse_path(path)
+        node = self.get_path(keys[:-1]) if keys else None
+        if not isinstance(node, AutoDict) or keys[-1] not in node:
+            raise KeyError(path)
+
+        del node[keys[-1]]
+
+    def view(self):
+        """
+        A read only :class:`ConfigView` of this node.  Reading a missing key through it creates nothing.
+
+        :rtype: ConfigView
+        """
+        return ConfigView(self)
+
+    def snapshot(self):
+        """
+        An immutable copy of this node: a hashable :class:`FrozenConfig`, safe to hand to other threads and read
+        without a lock.
+
+        Snapshots share the sections that didn't change.  Each node keeps its last snapshot until something under
+        it changes, so after a small change a new snapshot copies only the branches above it.  Branches holding
+        lists are copied every time, since lists can change without the tree noticing.
+
+        :rtype: FrozenConfig
+        """
+        with self.read_lock():
+            return _freeze_node(self)[0]
+
+    @synchronized
+    def subscribe(self, path, callback):
+        """
+        Call ``callback(paths)`` after a change at, below or above `path`, with the paths that changed: tuples of
+        keys from the root.
+
+        Changes made together (by one call, in a :meth:`lock` group, a ``batch()``, or a reload) are reported in
+        one call, once they're complete.  Callbacks run on the thread that made the changes, outside the lock.
+
+        >>> config.subscribe('database.*', lambda paths: reconnect())     # doctest: +SKIP
+        >>> config.subscribe('services.*.url', lambda paths: ...)         # doctest: +SKIP
+
+        :param path: Dotted keys, or a sequence of keys, relative to this node.  ``*`` matches any one key.
+        :type path: str|tuple|list
+        :return: `callback`
+        """
+        root = self._root
+        if root._subscriptions_ is None:
+            root._subscriptions_ = SubscriptionIndex()
+
+        root._subscriptions_.add(self._subscription_keys(path), callback)
+        return callback
+
+    @synchronized
+    def unsubscribe(self, path, callback):
+        """
+        Undo :meth:`subscribe`.
+
+        :raises ValueError: If `callback` isn't subscribed to `path`.
+        """
+        subscriptions = self._root._subscriptions_
+        if subscriptions is None:
+            raise ValueError('%r is not subscribed to %r' % (callback, path))
+
+        subscriptions.remove(self._subscription_keys(path), callback)
+
+    def _subscription_keys(self, path):
+        base = self._path
+        if base is None:
+            raise ValueError('Can not subscribe to a detached section.')
+        return base + _parse_path(path)
+
     def save(self):
         pass
 
+    def _adopt(self, obj):
+        """Fill this node from `obj`, a dict the tree takes ownership of, such as a freshly loaded file."""
+        with self.lock():
+            self.update(obj)
+
+    def _unloaded(self, key):
+        """
+        The member `key` left on disk when the config was loaded, loaded into the tree now, or ``_MISSING``.  See
+        :meth:`AutoSyncMixin._unloaded`.
+        """
+        return _MISSING
+
+    def _loaded_child(self, key, obj, memo):
+        """
+        What to store under `key` for the dict `obj` as it's loaded.  `obj` may be filled in after.
+
+        :param memo: Keys seen so far, to share equal ones.
+        """
+        return _build_node(self, key, obj, memo)
+
+    def _raw_members(self):
+        """
+        Members to serialize as they are, next to this node's own, as ``{key: json_text}``.
+
+        :rtype: dict|None
+        """
+        return None
+
+    def _changed(self, op, key=None, value=None):
+        """
+        Called after every change to this node.
+
+        :param op: ``'set'``, ``'del'``, ``'clear'``, ``'replace'`` when the node's whole content was swapped, or
+            ``'vivify'`` when reading a missing key created it
+        """
+        self._invalidate()
+
+        root = self._root
+        # vivified nodes are empty, they don't change the document
+        if root._subscriptions_ is None or op == 'vivify':
+            return
+
+        path = self._path
+        if path is None:
+            return
+        if op in ('set', 'del'):
+            path += (key,)
+
+        if root._notices_ is None:
+            root._notices_ = []
+        root._notices_.append(path)
+
+    def _take_notices(self):
+        """
+        Pair each subscriber with the changed paths it's subscribed to, and forget them.  Called on the root, holding
+        the mutex.
+
+        :rtype: list[(callable, list[tuple])]|None
+        """
+        paths, self._notices_ = self._notices_, None
+        if not paths:
+            return None
+
+        calls = []
+        found = {}
+        seen = set()
+        for path in paths:
+            if path in seen:
+                continue
+            seen.add(path)
+
+            for callback in self._subscriptions_.match(path):
+                callback_paths = found.get(callback)
+                if callback_paths is None:
+                    callback_paths = found[callback] = []
+                    calls.append((callback, callback_paths))
+                # subscribed through more than one pattern
+                if not callback_paths or callback_paths[-1] is not path:
+                    callback_paths.append(path)
+        return calls
+
+    def _invalidate(self):
+        """Drop cached state for this node and every ancestor up to the root."""
+        node = self
+        while node is not False and (node._cache_ is not None or node._frozen_ is not None):
+            node._cache_ = node._frozen_ = None
+            node = node._parent
+
     # noinspection PyMethodOverriding
     def __repr__(self):
-        if self._is_root:
-            cls_name = self.__class__.__name__
-            return '%s(%s)' % (cls_name, dict(self))
+        with self.read_lock():
+            if self._is_root:
+                cls_name = self.__class__.__name__
+                return '%s(%s)' % (cls_name, dict.__repr__(self))
 
-        return repr(dict(self))
+            return dict.__repr__(self)
 
     def __str__(self):
         return repr(self)
@@ -162,56 +561,1340 @@ class AutoDict(TraceRootMixin, defaultdict):
         return repr(self)
 
 
+_MISSING = object()
+
+
+def _parse_path(path):
+    """:rtype: tuple"""
+    if isinstance(path, string_types):
+        return _split_path(path)
+    return tuple(path)
+
+
+@lru_cache(maxsize=1024)
+def _split_path(path):
+    return tuple(path.split('.')) if path else ()
+
+
+def _items(obj):
+    # plain dict access, so lazy nodes aren't materialized just to be copied
+    if isinstance(obj, dict):
+        return dict.items(obj)
+    if hasattr(obj, 'keys') and callable(obj.keys):
+        return [(key, obj[key]) for key in obj.keys()]
+    return obj
+
+
+# noinspection PyProtectedMember
+def _build_node(parent, key, obj, memo=None):
+    """
+    A new child of `parent` holding a copy of the nested dict `obj`.
+
+    Nodes are built directly, without ``__init__`` or ``__setitem__``: nothing is locked, recorded or saved per
+    key.  The caller holds the mutex and reports the change.
+
+    :param memo: Share equal keys through this dict, as :func:`json.loads` does.
+    :type parent: AutoDict
+    :rtype: AutoDict
+    """
+    cls = parent.__class__
+    node = cls.__new__(cls)
+    node._root_ = parent._root_
+    node._parent_ = parent
+    node._key = key
+    node._cache_ = None
+    node._frozen_ = None
+    node._vivified_ = False
+    _fill(node, obj, memo)
+    return node
+
+
+def _fill(node, obj, memo=None):
+    """Copy `obj` into `node`, building nested dicts into nodes.  See :func:`_build_node`."""
+    setitem = dict.__setitem__
+    for key, value in _items(obj):
+        if memo is not None:
+            key = memo.setdefault(key, key)
+        if isinstance(value, dict):
+            value = _build_node(node, key, value, memo)
+        setitem(node, key, value)
+
+
+def _plain(obj):
+    """A copy of `obj` with nodes turned into plain dicts."""
+    if isinstance(obj, dict):
+        return dict((key, _plain(value)) for key, value in _items(obj))
+    return obj
+
+
+def _share_keys(obj, memo):
+    """A plain copy of the nested dict `obj`, its keys shared through `memo`.  See :func:`_build_node`."""
+    setdefault = memo.setdefault
+    return dict(
+        (setdefault(key, key), _share_keys(value, memo) if type(value) is dict else value)
+        for key, value in dict.items(obj)
+    )
+
+
+# noinspection PyProtectedMember
+def _merge(node, obj, deep):
+    """Update `node` from `obj`, reporting each change.  With `deep`, nested dicts merge into existing nodes."""
+    for key, value in _items(obj):
+        old = dict.get(node, key, _MISSING)
+
+        if isinstance(value, dict):
+            if deep and old is _MISSING:
+                old = node._unloaded(key)
+            if deep and isinstance(old, dict):
+                _merge(node[key], value, deep)
+                continue
+            if _is_same(old, value) and not (isinstance(old, AutoDict) and old._vivified_):
+                continue
+            value = _build_node(node, key, value)
+        elif _is_same(old, value):
+            continue
+
+        dict.__setitem__(node, key, value)
+        node._changed('set', key, value)
+
+
+# noinspection PyProtectedMember
+def _patch(node, obj, memo):
+    """
+    Make `node` hold the same as the plain dict `obj`, in place, reporting each change.
+
+    Nested nodes are patched rather than replaced, and members that didn't change are left alone, so nodes keep
+    their identity and cached fragments unless something under them changed.  Empty sections made by reads are
+    kept too, as they're never written.
+
+    :param memo: Share equal keys of new members through this dict.  See :meth:`AutoDict._loaded_child`.
+    """
+    for key in [key for key in dict.keys(node) if key not in obj]:
+        old = dict.__getitem__(node, key)
+        if isinstance(old, AutoDict) and old._vivified_ and not old:
+            continue
+        dict.__delitem__(node, key)
+        node._changed('del', key)
+
+    get = dict.get
+    for key, value in dict.items(obj):
+        old = get(node, key, _MISSING)
+        kind = type(value)
+
+        # plain type checks: this runs for every member of the file, and isinstance(old, AutoDict) is slow
+        if kind is dict and type(old) is not dict and isinstance(old, dict):
+            if old._vivified_:
+                # on disk now, so it's written even while empty
+                old._vivified_ = False
+                node._changed('set', key, old)
+            _patch(old, value, memo)
+            continue
+        if kind is type(old) and kind in _LEAF_TYPES and old == value:
+            continue
+        if _is_same(old, value):
+            continue
+
+        if type(value) is dict:
+            value = node._loaded_child(key, value, memo)
+        dict.__setitem__(node, key, value)
+        node._changed('set', key, value)
+
+
+class ConfigView(Mapping):
+    """
+    Read only view of a node.  Nested dicts are viewed too, and missing keys read as an empty view, so probing a
+    deep path never allocates nodes:
+
+    >>> if config.view()['features']['beta']['enabled']:  # doctest: +SKIP
+    ...     pass
+
+    Reads are live: the view follows later changes to the node.
+    """
+    __slots__ = ('_node',)
+
+    def __init__(self, node=None):
+        self._node = {} if node is None else node
+
+    def __getitem__(self, key):
+        value = dict.get(self._node, key, _MISSING)
+        if value is _MISSING:
+            return _EMPTY_VIEW
+        if isinstance(value, dict):
+            return ConfigView(value)
+        return value
+
+    def __contains__(self, key):
+        return key in self._node
+
+    def __iter__(self):
+        return iter(self._node)
+
+    def __len__(self):
+        return len(self._node)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._node else default
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, dict.__repr__(self._node))
+
+
+_EMPTY_VIEW = ConfigView()
+
+
+class FrozenConfig(dict):
+    """
+    Immutable copy of a node, from :meth:`AutoDict.snapshot`.  Nested dicts are frozen too, and lists become
+    :class:`FrozenList`.  Still a dict, so it compares equal to the config it was taken from and serializes as one.
+
+    >>> snapshot = config.snapshot()                    # doctest: +SKIP
+    >>> executor.submit(render, snapshot)               # doctest: +SKIP
+    """
+    __slots__ = ('_hash',)
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._hash = None
+
+    def __hash__(self):
+        if self._hash is None:
+            # nested snapshots cache their own hash, so a shared section is hashed once
+            self._hash = hash(frozenset(dict.items(self)))
+        return self._hash
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, dict.__repr__(self))
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError('%s is immutable' % self.__class__.__name__)
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _immutable
+
+
+class FrozenList(tuple):
+    """A list in a :class:`FrozenConfig`: a tuple that compares equal to a list holding the same."""
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            other = tuple(other)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        is_equal = self.__eq__(other)
+        return is_equal if is_equal is NotImplemented else not is_equal
+
+    __hash__ = tuple.__hash__
+
+
+def _freeze(value):
+    """A frozen copy of the plain value `value`.  See :class:`FrozenConfig`."""
+    kind = type(value)
+    if kind is FrozenConfig or kind is FrozenList:
+        return value
+    if isinstance(value, dict):
+        return FrozenConfig((key, _freeze(item)) for key, item in _items(value))
+    if isinstance(value, (list, tuple)):
+        return FrozenList(_freeze(item) for item in value)
+    return value
+
+
+# noinspection PyProtectedMember
+def _freeze_node(node):
+    """
+    A :class:`FrozenConfig` of `node`, reusing the snapshots cached on nodes that didn't change.
+
+    Cached like fragments (see :func:`_encode_fragment`): on the node, until a write invalidates it, and never for
+    nodes holding mutable leaves.  Vivified nodes holding nothing but other such nodes are left out of their parent.
+
+    :type node: AutoDict
+    :rtype: (FrozenConfig, bool)
+    """
+    frozen = node._frozen_
+    if frozen is not None:
+        return frozen, True
+
+    cacheable = True
+    items = []
+    for key, value in dict.items(node):
+        if isinstance(value, AutoDict):
+            child, is_cached = _freeze_node(value)
+            cacheable = cacheable and is_cached
+            if value._vivified_ and not child:
+                continue
+            items.append((key, child))
+        elif isinstance(value, _FROZEN_TYPES):
+            items.append((key, value))
+        else:
+            # plain dicts are left by lazy loading, and never handed out (see LazyNodeMixin)
+            cacheable = cacheable and type(value) is dict
+            items.append((key, _freeze(value)))
+
+    frozen = FrozenConfig(items)
+    if cacheable:
+        node._frozen_ = frozen
+    return frozen, cacheable
+
+
+def _is_same(old, new):
+    """
+    Would replacing `old` with `new` leave the document unchanged?
+
+    Stricter than ``==``: ``1``, ``1.0`` and ``True`` compare equal but serialize differently.  A mutable leaf
+    assigned back onto itself may have been changed in place, so it always counts as a change.
+    """
+    kind = type(new)
+    if kind is type(old) and kind in _LEAF_TYPES:
+        return old is new or old == new
+
+    if old is new:
+        return isinstance(old, _FROZEN_TYPES) or isinstance(old, AutoDict)
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        if len(old) != len(new):
+            return False
+
+        get = dict.get
+        for key, value in dict.items(new):
+            other = get(old, key, _MISSING)
+            # the common case inline, this runs for every leaf
+            kind = type(value)
+            if kind is type(other) and kind in _LEAF_TYPES:
+                if other != value:
+                    return False
+            elif not _is_same(other, value):
+                return False
+        return True
+
+    if isinstance(old, list) and isinstance(new, list):
+        return len(old) == len(new) and all(_is_same(a, b) for a, b in zip(old, new))
+
+    return type(old) is type(new) and isinstance(new, _FROZEN_TYPES) and old == new
+
+
+# noinspection PyProtectedMember
+class LazyNodeMixin(AbstractTraceRoot):
+    """
+    Leave nested dicts loaded from a file as plain dicts, and wrap each into a node the first time it's touched.
+
+    Put it before :class:`AutoDict` in the bases.  Plain dicts are private to the tree: every way of reading one
+    hands out a node instead.
+    """
+
+    def __getitem__(self, key):
+        # noinspection PyUnresolvedReferences
+        value = super(LazyNodeMixin, self).__getitem__(key)
+        if type(value) is dict:
+            value = self._materialize(key)
+        return value
+
+    def __iter__(self):
+        # Overridden, so dict(node) and {**node} copy through __getitem__ and hand out nodes.  Otherwise CPython
+        # copies the plain dicts straight out of the table.
+        # noinspection PyUnresolvedReferences
+        return super(LazyNodeMixin, self).__iter__()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def pop(self, key, *default):
+        # noinspection PyUnresolvedReferences
+        value = super(LazyNodeMixin, self).pop(key, *default)
+        if type(value) is dict:
+            value = self._wrap(key, value)
+        return value
+
+    def popitem(self):
+        # noinspection PyUnresolvedReferences
+        key, value = super(LazyNodeMixin, self).popitem()
+        if type(value) is dict:
+            value = self._wrap(key, value)
+        return key, value
+
+    def _loaded_child(self, key, obj, memo):
+        return _share_keys(obj, memo)
+
+    def _adopt(self, obj):
+        with self._mutex:
+            dict.update(self, obj)
+            # noinspection PyUnresolvedReferences
+            self._invalidate()
+
+    @synchronized
+    def _materialize(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) is not dict:
+            # another thread got here first
+            return value
+
+        node = self._wrap(key, value)
+        dict.__setitem__(self, key, node)
+
+        # the cached fragments were built trusting the plain dict's lists never changed
+        # noinspection PyUnresolvedReferences
+        self._invalidate()
+        return node
+
+    def _wrap(self, key, obj):
+        node = self.__class__(_root=self._root, _parent=self, _key=key)
+        node._adopt(obj)
+        return node
+
+
+# noinspection PyUnresolvedReferences
+class RevalidateMixin(AbstractTraceRoot):
+    """
+    Before a read through the root, :meth:`AutoSyncMixin.revalidate` if ``revalidate_ttl`` seconds passed since
+    the last check.  Bounds how stale the config can be, at the cost of one ``os.stat`` per TTL.
+
+    Put it first in the bases.  Reads below the root aren't checked: a node read from the root was checked on the
+    way.
+    """
+
+    def __getitem__(self, key):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).__getitem__(key)
+
+    def __contains__(self, key):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).__contains__(key)
+
+    def __iter__(self):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).__iter__()
+
+    def __len__(self):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).__len__()
+
+    def get(self, key, default=None):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).get(key, default)
+
+    def keys(self):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).keys()
+
+    def values(self):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).values()
+
+    def items(self):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).items()
+
+    def get_path(self, path, default=None):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).get_path(path, default)
+
+    def has_path(self, path):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).has_path(path)
+
+    def view(self):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).view()
+
+    def snapshot(self):
+        if self._root_ is self:
+            self._revalidate_if_due()
+        return super(RevalidateMixin, self).snapshot()
+
+
 # noinspection PyAbstractClass
 class AutoSyncMixin(AbstractSaveFile, AbstractTraceRoot, AbstractSerializer):
+    save_delay = None
+    """Debounce interval, in seconds.  Saves within this window of the last write are coalesced."""
+    atomic_save = True
+    """Write to a temp file and rename it into place, so readers never see a partial file."""
+    fsync_policy = FSYNC_NONE
+    """One of ``'none'``, ``'file'`` or ``'file+dir'``.  See :func:`json_config.storage.write_atomic`."""
+    journal = False
+    """Append changes to :attr:`journal_file` instead of rewriting :attr:`config_file` on every save."""
+    journal_max_records = 1000
+    """Compact once the journal holds this many records."""
+    journal_max_bytes = 1 << 20
+    """Compact once the journal grows past this many bytes."""
+    writer = None
+    """:class:`json_config.writer.BackgroundWriter` that runs saves off the caller's thread, if any."""
+    multiprocess = False
+    """Share :attr:`config_file` with other processes: saves lock it, and merge our changes into theirs."""
+    streaming = False
+    """Decode :attr:`config_file` into the tree in chunks, instead of reading the whole text first."""
+    sections = None
+    """
+    Top-level keys to load from :attr:`config_file`, through :attr:`index_file`.  The others are left on disk, and
+    written back as they are.
+
+    :type sections: frozenset|None
+    """
+    section_index = False
+    """Keep :attr:`index_file` up to date on every save, so configs loading only some ``sections`` seek to them."""
+    watcher = None
+    """:class:`json_config.watch.Watcher` that reloads :attr:`config_file` when another process changes it, if any."""
+    revalidate_ttl = None
+    """Seconds between :meth:`revalidate` checks made by reads through the root.  See :class:`RevalidateMixin`."""
+    revalidations = 0
+    """Times :meth:`revalidate` checked :attr:`config_file`."""
+    reloads = 0
+    """Times :meth:`reload` read :attr:`config_file` again."""
+
+    _dirty_ = False
+    _batch_depth_ = 0
+    _saved_at_ = None
+    _timer_ = None
+    _pending_ = None
+    """:type _pending_: list|None"""
+    _journal_records_ = 0
+    _journal_bytes_ = 0
+    _loading_ = False
+    _disk_signature_ = None
+    _fingerprint_ = None
+    """:type _fingerprint_: (int, int)|None"""
+    _written_cache_ = None
+    _revalidated_at_ = None
+
     def __init__(self, **kwargs):
         config_file = kwargs.pop('config_file', None)
         """:type config_file: str|None"""
+        save_delay = kwargs.pop('save_delay', None)
+        """:type save_delay: float|None"""
+        atomic_save = kwargs.pop('atomic_save', None)
+        """:type atomic_save: bool|None"""
+        fsync_policy = kwargs.pop('fsync_policy', None)
+        """:type fsync_policy: str|None"""
+        journal = kwargs.pop('journal', None)
+        """:type journal: bool|None"""
+        background = kwargs.pop('background', None)
+        """:type background: bool|json_config.writer.BackgroundWriter|None"""
+        rwlock = kwargs.pop('rwlock', None)
+        """:type rwlock: bool|None"""
+        multiprocess = kwargs.pop('multiprocess', None)
+        """:type multiprocess: bool|None"""
+        streaming = kwargs.pop('streaming', None)
+        """:type streaming: bool|None"""
+        sections = kwargs.pop('sections', None)
+        """:type sections: list[str]|None"""
+        section_index = kwargs.pop('section_index', None)
+        """:type section_index: bool|None"""
+        watch = kwargs.pop('watch', None)
+        """:type watch: bool|json_config.watch.Watcher|None"""
+        revalidate = kwargs.pop('revalidate', None)
+        """:type revalidate: float|None"""
+
+        if rwlock is not None:
+            self.rwlock = rwlock
+
+        if save_delay is not None:
+            self.save_delay = save_delay
+
+        if atomic_save is not None:
+            self.atomic_save = atomic_save
+
+        if fsync_policy is not None:
+            if fsync_policy not in FSYNC_POLICIES:
+                raise ValueError('Unknown fsync_policy %r, expected one of %r' % (fsync_policy, FSYNC_POLICIES))
+            self.fsync_policy = fsync_policy
+
+        if journal is not None:
+            self.journal = journal
 
+        if background is True:
+            self.writer = default_writer()
+        elif background:
+            self.writer = background
+
+        if multiprocess is not None:
+            self.multiprocess = multiprocess
+
+        if streaming is not None:
+            self.streaming = streaming
+
+        if sections is not None:
+            self.sections = frozenset(sections)
+            self.section_index = True
+
+        if section_index is not None:
+            self.section_index = section_index
+
+        if watch is True:
+            self.watcher = default_watcher()
+        elif watch:
+            self.watcher = watch
+
+        if revalidate is not None:
+            self.revalidate_ttl = revalidate
+            # about to be read
+            self._revalidated_at_ = monotonic()
+
+        if self.journal and self.writer is not None:
+            raise ValueError('Journal mode and background writes can not be combined.')
+
+        if self.multiprocess and (self.journal or self.writer is not None):
+            raise ValueError('Multiprocess mode can not be combined with journal mode or background writes.')
+
+        if self.streaming and not hasattr(self, 'deserialize_into'):
+            raise ValueError('%s can not stream files.' % self.__class__.__name__)
+
+        if self.sections is not None and (self.journal or self.multiprocess):
+            raise ValueError('Loading sections can not be combined with journal or multiprocess modes.')
+
+        if self.section_index and not hasattr(self, 'index_serialized'):
+            raise ValueError('%s can not index sections.' % self.__class__.__name__)
+
+        if self.revalidate_ttl is not None and not isinstance(self, RevalidateMixin):
+            raise ValueError('%s does not revalidate on reads, connect() one with revalidate.' %
+                             self.__class__.__name__)
+
+        loaded = None
+        is_partial = config_file is not None and self.sections is not None and 'obj' not in kwargs
+        is_streaming = config_file is not None and self.streaming and 'obj' not in kwargs and not is_partial
         if config_file is not None:
             self.config_file = config_file
 
-            try:
-                with open(config_file) as f:
-                    string = f.read()
-                obj = self.deserialize(string)
-                kwargs.setdefault('obj', obj)
-            except FileNotFoundError:
-                pass
+        if config_file is not None and not (is_streaming or is_partial):
+            if self.multiprocess:
+                with file_lock(self.lock_file, exclusive=False):
+                    obj = self._read_file()
+            else:
+                obj = self._read_file()
+
+            if self.journal:
+                obj = self._replay_journal(obj)
+
+            if obj is not None and 'obj' not in kwargs:
+                loaded = obj
 
         # noinspection PyUnresolvedReferences
         super(AutoSyncMixin, self).__init__(**kwargs)
 
+        if is_partial:
+            loaded = self._read_sections()
+
+        if loaded is not None:
+            self._adopt(loaded)
+        elif is_streaming:
+            if self.multiprocess:
+                with file_lock(self.lock_file, exclusive=False):
+                    self._stream_file()
+            else:
+                self._stream_file()
+
+            if self.journal:
+                self._replay_journal_into_tree()
+
+        # loading isn't a change
+        if self._is_root:
+            self._pending_ = None
+
+        if config_file is not None and self.watcher is not None:
+            self.watcher.watch(self)
+
+        # just read
+        if self._is_root and self.revalidate_ttl is not None:
+            self._revalidated_at_ = monotonic()
+
+    @synchronized
     def __setitem__(self, key, value):
         # noinspection PyUnresolvedReferences
         super(AutoSyncMixin, self).__setitem__(key, value)
 
-        is_cls = isinstance(self[key], self.__class__)
-        if not is_cls and not self._is_locked:
+        # dicts became nodes
+        if not isinstance(value, dict) and not self._is_locked:
             self._root.save()
 
+    @property
+    def journal_file(self):
+        return self._root.config_file + '.journal'
+
+    @property
+    def index_file(self):
+        return self._root.config_file + '.index'
+
+    @property
+    def lock_file(self):
+        # read during __init__, before `_root` is set
+        return self.config_file + '.lock'
+
+    def _changed(self, op, key=None, value=None):
+        # noinspection PyUnresolvedReferences
+        super(AutoSyncMixin, self)._changed(op, key, value)
+
+        if op in ('set', 'del') and self.sections is not None and key not in self.sections:
+            # ours now, whatever is on disk
+            self.sections = self.sections.union([key])
+
+        root = self._root
+        # a watched or revalidating config replays its unsaved changes over the file it reloads
+        is_replayed = root.watcher is not None or root.revalidate_ttl is not None
+        if not (root.journal or root.multiprocess or is_replayed) or root._loading_:
+            return
+
+        # vivified nodes hold nothing worth replaying
+        if op == 'vivify':
+            return
+
+        # detached nodes are recorded whole, once they're attached
+        path = self._path
+        if path is None:
+            return
+
+        if op == 'set':
+            record = [op, list(path) + [key], value]
+        elif op == 'del':
+            record = [op, list(path) + [key]]
+        else:
+            record = ['set', list(path), self if op == 'replace' else {}]
+
+        if root._pending_ is None:
+            root._pending_ = []
+        root._pending_.append(record)
+
+    @synchronized
     def save(self):
         if not self._is_root:
             raise RuntimeError('Trying to save from wrong node.')
 
-        with open(self.config_file, 'w') as f:
-            f.write(self.serialize())
+        if self._batch_depth_:
+            return self._defer()
+
+        if self.save_delay and self._saved_at_ is not None:
+            remaining = self._saved_at_ + self.save_delay - monotonic()
+            if remaining > 0:
+                return self._defer(remaining)
+
+        self._write()
+
+    def flush(self, timeout=None):
+        """
+        Write pending changes now, if any saves were deferred.
+
+        With a background :attr:`writer`, also wait for queued writes to reach the disk.
+
+        :return: ``False`` if `timeout` expired before the background write finished.
+        """
+        root = self._root
+
+        with root._mutex:
+            if root._timer_ is not None:
+                root._timer_.cancel()
+                root._timer_ = None
+
+            if root._dirty_:
+                root._write()
+
+        if root.writer is not None:
+            return root.writer.flush(id(root), timeout)
+        return True
+
+    def close(self, timeout=None):
+        """
+        Flush pending changes and stop using the background :attr:`writer`.  Later saves are synchronous.
+
+        Also stops the :attr:`watcher` reloading the config.
+        """
+        root = self._root
+
+        if root.watcher is not None:
+            root.watcher.unwatch(root)
+            root.watcher = None
+
+        is_flushed = root.flush(timeout)
+        if is_flushed:
+            root.writer = None
+        return is_flushed
+
+    def reload(self):
+        """
+        Update the tree to :attr:`config_file`'s contents, as another process may have changed it.
+
+        The file is diffed against the tree, and only what changed is replaced.  Nodes keep their identity, so
+        sections held elsewhere (``db = config['database']``) see the new values, and unchanged branches keep
+        their cached JSON.
+
+        Watched, revalidating, journaled and multiprocess configs replay changes that weren't written yet (in a
+        batch, or waiting on ``save_delay``) over the file's.  Other configs drop them.
+
+        With ``sections``, only those are read again.
+        """
+        root = self._root
+
+        with root._mutex:
+            if root.sections is not None:
+                obj = root._read_sections()
+            elif root.multiprocess:
+                with file_lock(root.lock_file, exclusive=False):
+                    obj = root._read_file()
+            else:
+                obj = root._read_file()
+
+            if root.journal:
+                obj = root._replay_journal(obj)
+
+            obj = obj or {}
+            root._replay_pending(obj)
+            root._load(obj)
+            root.reloads += 1
+
+    def revalidate(self):
+        """
+        :meth:`reload` if :attr:`config_file` changed since we last read or wrote it.  Going by its ``(mtime_ns,
+        size, inode)``, checking costs one ``os.stat``.
+
+        :return: Whether the config was reloaded.
+        """
+        root = self._root
+
+        with root._mutex:
+            root._revalidated_at_ = monotonic()
+            root.revalidations += 1
+            return root._file_changed()
+
+    def _revalidate_if_due(self):
+        """:meth:`revalidate` the root, if :attr:`revalidate_ttl` passed since it was last checked."""
+        checked_at = self._revalidated_at_
+        if checked_at is not None and monotonic() - checked_at < self.revalidate_ttl:
+            return
+
+        mutex = self._mutex_
+        if isinstance(mutex, ReadWriteLock) and mutex.is_reading():
+            # reloading would upgrade our shared lock; the next read outside read_lock() checks instead
+            return
+
+        with self._mutex:
+            # another thread may have checked meanwhile
+            checked_at = self._revalidated_at_
+            if checked_at is not None and monotonic() - checked_at < self.revalidate_ttl:
+                return
+
+            try:
+                self.revalidate()
+            except Exception:
+                # e.g. another process is half way through writing it: keep serving what we have
+                logger.exception('Reloading %s failed', self.config_file)
+
+    def _file_changed(self):
+        """
+        Called by the :attr:`watcher`.  Reload, unless the file is gone or is the one we last read or wrote.
+
+        :return: Whether the config was reloaded.
+        """
+        with self._mutex:
+            signature = file_signature(self.config_file)
+            if signature is None or signature == self._disk_signature_:
+                return False
+
+            self.reload()
+            return True
+
+    @contextmanager
+    def batch(self):
+        """
+        Defer saves until the outermost batch exits, then write once.
+
+        Usage::
+
+            with config.batch():
+                for key, value in values:
+                    config[key] = value
+        """
+        root = self._root
+        with root._mutex:
+            root._batch_depth_ += 1
+        try:
+            yield self
+        finally:
+            with root._mutex:
+                root._batch_depth_ -= 1
+                is_outermost = not root._batch_depth_
+            if is_outermost:
+                root.flush()
+
+    def _take_notices(self):
+        # reported when the outermost batch exits
+        if self._batch_depth_:
+            return None
+        # noinspection PyUnresolvedReferences
+        return super(AutoSyncMixin, self)._take_notices()
+
+    def _defer(self, delay=None):
+        self._dirty_ = True
+        _dirty_roots[id(self)] = weakref.ref(self)
+
+        if delay is not None and self._timer_ is None:
+            self._timer_ = timer = Timer(delay, self.flush)
+            timer.daemon = True
+            timer.start()
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot of :attr:`config_file`."""
+        root = self._root
+        with root._mutex:
+            root._write_snapshot()
+            root._mark_clean()
+
+    def _read_file(self):
+        """
+        Deserialize :attr:`config_file`.
+
+        :return: The file's contents, or ``None`` if there's no file.
+        """
+        signature = file_signature(self.config_file)
+        try:
+            with open(self.config_file) as f:
+                string = f.read()
+        except FileNotFoundError:
+            return None
+        finally:
+            self._disk_signature_ = signature
+            # we don't know what we last wrote relative to what's there now
+            self._fingerprint_ = self._written_cache_ = None
+
+        return self.deserialize(string)
+
+    def _stream_file(self):
+        """Like :meth:`_read_file` then :meth:`_load`, without holding the file's whole text."""
+        self._disk_signature_ = file_signature(self.config_file)
+        self._fingerprint_ = self._written_cache_ = None
+        try:
+            f = open(self.config_file)
+        except FileNotFoundError:
+            return
+
+        with f, self.lock():
+            self._loading_ = True
+            try:
+                # noinspection PyUnresolvedReferences
+                self.deserialize_into(f)
+            finally:
+                self._loading_ = False
+
+    def _read_sections(self):
+        """
+        Deserialize only :attr:`sections` from :attr:`config_file`, seeking to them through :attr:`index_file`.
+
+        :return: The sections found, or ``None`` if there's no file.
+        """
+        self._disk_signature_ = None
+        self._fingerprint_ = self._written_cache_ = None
+        try:
+            f = open(self.config_file, 'rb')
+        except FileNotFoundError:
+            return None
+
+        with f:
+            signature = stat_signature(os.fstat(f.fileno()))
+            members = read_members(f, self._section_spans(f, signature), self.sections)
+
+        self._disk_signature_ = signature
+        return dict((key, self.deserialize(text)) for key, text in members.items())
+
+    def _section_spans(self, f, signature):
+        """Where each top-level member of the open :attr:`config_file` `f` is.  Indexes it if needed."""
+        spans = read_index(self.index_file, signature)
+        if spans is None:
+            spans = scan_index(f)
+            write_index(self.index_file, signature, spans, self.fsync_policy)
+        return spans
+
+    def _raw_members(self):
+        """The members of :attr:`config_file` outside :attr:`sections`, as they are on disk now."""
+        if self.sections is None or not self._is_root:
+            return None
+
+        try:
+            f = open(self.config_file, 'rb')
+        except FileNotFoundError:
+            return None
+
+        with f:
+            spans = self._section_spans(f, stat_signature(os.fstat(f.fileno())))
+            return read_members(f, spans, [key for key in spans if key not in self.sections])
+
+    def _unloaded(self, key):
+        """
+        Load the top-level member `key` from :attr:`config_file`, when it was left there by :attr:`sections`, so
+        writing below it changes it instead of replacing it.
+
+        :return: The member, or ``_MISSING`` if it's not one of those.
+        """
+        if self.sections is None or not self._is_root or key in self.sections:
+            return _MISSING
+
+        with self._mutex:
+            if key in self:
+                # another thread got here first
+                return self[key]
+
+            try:
+                f = open(self.config_file, 'rb')
+            except FileNotFoundError:
+                return _MISSING
+
+            with f:
+                spans = self._section_spans(f, stat_signature(os.fstat(f.fileno())))
+                members = read_members(f, spans, [key]) if key in spans else {}
+            if key not in members:
+                return _MISSING
+
+            value = self.deserialize(members[key])
+            if isinstance(value, dict):
+                value = self._loaded_child(key, value, {})
+            dict.__setitem__(self, key, value)
+            self.sections = self.sections.union([key])
+            self._invalidate()
+            return self[key]
+
+    @synchronized
+    def _load(self, obj):
+        """
+        Make the tree hold `obj`, without recording or saving the change.  Only what differs is replaced: see
+        :func:`_patch`.
+        """
+        with self.lock():
+            self._loading_ = True
+            try:
+                _patch(self, obj, {})
+            finally:
+                self._loading_ = False
+
+    def _replay_journal(self, obj):
+        # called before the node is initialized, `_root` isn't set yet
+        records, size = read_journal(self.config_file + '.journal')
+        if not records:
+            return obj
+
+        if obj is None:
+            obj = {}
+        apply_changes(obj, records)
+
+        self._journal_records_ = len(records)
+        self._journal_bytes_ = size
+        return obj
+
+    def _replay_journal_into_tree(self):
+        """:meth:`_replay_journal`, for a tree that's already loaded."""
+        records, size = read_journal(self.journal_file)
+
+        with self.lock():
+            self._loading_ = True
+            try:
+                for record in records:
+                    op, keys = record[0], record[1]
+                    if op == 'set' and not keys:
+                        self.replace(record[2])
+                    elif op == 'set':
+                        self.set_path(keys, record[2])
+                    else:
+                        parent = self.get_path(keys[:-1])
+                        if isinstance(parent, AutoDict):
+                            parent.pop(keys[-1], None)
+            finally:
+                self._loading_ = False
+
+        self._journal_records_ = len(records)
+        self._journal_bytes_ = size
+
+    @synchronized
+    def _write(self):
+        if self.multiprocess:
+            self._merge_and_write()
+        elif self.journal and self._pending_ and os.path.exists(self.config_file):
+            self._append_journal()
+        else:
+            self._write_snapshot()
+        self._mark_clean()
+
+    def _merge_and_write(self):
+        """
+        Write under the file lock.  If another process saved since we last read the file, replay our changes over
+        theirs first.
+        """
+        # held, so loading the merged file doesn't save (and take the file lock) again
+        with file_lock(self.lock_file), self.lock():
+            if file_signature(self.config_file) != self._disk_signature_:
+                obj = self._read_file() or {}
+                self._replay_pending(obj)
+                self._load(obj)
+
+            self._pending_ = None
+            self._write_snapshot()
+
+    def _replay_pending(self, obj):
+        """Apply the changes not written yet onto the plain dict `obj`, read from the file."""
+        # copied, so replaying them leaves the nodes in the records alone
+        apply_changes(obj, [record[:2] + [_plain(value) for value in record[2:]] for record in self._pending_ or []])
+
+    def _mark_clean(self):
+        self._dirty_ = False
+        self._saved_at_ = monotonic()
+        _dirty_roots.pop(id(self), None)
+
+    def _write_snapshot(self):
+        write_file = write_atomic if self.atomic_save else write_in_place
+
+        # Journal everything first.  Should we crash before the journal is removed, replaying it over the new
+        # snapshot is harmless, since the snapshot already holds the result of every record.
+        if self.journal and self._pending_:
+            pending, self._pending_ = self._pending_, None
+            append_journal(self.journal_file, pending, self.fsync_policy)
+
+        data = self._snapshot_data()
+        if data is None:
+            pass
+        elif self.writer is not None:
+            self.writer.submit(id(self), self._write_queued, write_file, data)
+        else:
+            try:
+                self._disk_signature_ = self._write_file(write_file, data)
+            except Exception:
+                self._fingerprint_ = self._written_cache_ = None
+                raise
+
+        if self.journal:
+            remove_journal(self.journal_file)
+            self._pending_ = None
+            self._journal_records_ = self._journal_bytes_ = 0
+
+    def _snapshot_data(self):
+        """
+        Serialize the tree for a snapshot, or return ``None`` when :attr:`config_file` already holds it.
+
+        The root remembers a fingerprint of the last document it wrote.  While the root's cached fragment is the
+        one that was written, nothing changed since and serialization is skipped too.
+
+        :rtype: str|None
+        """
+        # the snapshot holds every change so far
+        self._pending_ = None
+
+        cache = self._cache_
+        if cache is not None and cache is self._written_cache_ and self._is_disk_ours():
+            return None
+
+        data = self.serialize()
+        fingerprint = len(data), hash(data)
+        is_written = fingerprint == self._fingerprint_ and self._is_disk_ours()
+
+        self._fingerprint_ = fingerprint
+        self._written_cache_ = self._cache_
+        return None if is_written else data
+
+    def _write_file(self, write_file, data):
+        """
+        Write `data` to :attr:`config_file` with `write_file`, and index it if :attr:`section_index` is set.
+
+        :return: The written file's signature.
+        """
+        write_file(self.config_file, data, self.fsync_policy)
+        signature = file_signature(self.config_file)
+
+        if self.section_index:
+            # noinspection PyUnresolvedReferences
+            indexed = self.index_serialized(data)
+            # a size mismatch means the file isn't utf-8, or isn't ours anymore
+            if indexed is not None and signature is not None and indexed[1] == signature[1]:
+                write_index(self.index_file, signature, indexed[0], self.fsync_policy)
+
+        return signature
+
+    def _is_disk_ours(self):
+        """Is :attr:`config_file` still the one we last wrote?  Queued writes are trusted to land."""
+        return self.writer is not None or file_signature(self.config_file) == self._disk_signature_
+
+    def _write_queued(self, write_file, data):
+        """Run by the background :attr:`writer`."""
+        try:
+            self._disk_signature_ = self._write_file(write_file, data)
+        except Exception:
+            self._fingerprint_ = self._written_cache_ = None
+            # Stay dirty until a write lands, so `flush()` and the exit hook retry it.  No mutex here: the caller
+            # may hold it while blocked on this writer.
+            self._defer()
+            raise
+
+    def _append_journal(self):
+        pending, self._pending_ = self._pending_, None
+
+        self._journal_records_ += len(pending)
+        self._journal_bytes_ += append_journal(self.journal_file, pending, self.fsync_policy)
+
+        if self._journal_records_ >= self.journal_max_records or self._journal_bytes_ >= self.journal_max_bytes:
+            self._write_snapshot()
+
+
+_dirty_roots = {}
+""":type _dirty_roots: dict[int, weakref.ref]"""
+
+
+@atexit.register
+def _flush_dirty_roots():
+    for ref in list(_dirty_roots.values()):
+        root = ref()
+        if root is not None:
+            root.flush()
 
 
 class PrettyJSONMixin(AbstractSerializer):
     serializer_indent = 2
     serializer_sort_keys = True
+    serializer_separators = (',', ': ')
     serializer_ext = 'json'
+    serializer_codec = AUTO
+    """One of :data:`json_config.codecs.CODECS`.  ``'auto'`` uses the fastest one installed."""
+
+    def __init__(self, *args, **kwargs):
+        codec = kwargs.pop('codec', None)
+        """:type codec: str|None"""
+
+        if codec is not None:
+            get_codec(codec)
+            self.serializer_codec = codec
+
+        # noinspection PyArgumentList
+        super(PrettyJSONMixin, self).__init__(*args, **kwargs)
+
+    @property
+    def codec(self):
+        """:rtype: json_config.codecs.Codec"""
+        return get_codec(self.serializer_codec)
 
     def deserialize(self, string):
-        return json.loads(string)
+        return self.codec.loads(string)
+
+    def deserialize_into(self, f):
+        """Decode the text file `f` into this empty node, a chunk at a time."""
+        load_into(f, self, _wrap_loaded)
+        self._invalidate()
+
+    def index_serialized(self, string):
+        """
+        Byte spans of the top-level members in `string`, from :meth:`serialize`.  See
+        :func:`json_config.sections.index_text`.
+        """
+        return index_text(string, self.serializer_indent)
 
     def serialize(self, **options):
         options.setdefault('indent', self.serializer_indent)
         options.setdefault('sort_keys', self.serializer_sort_keys)
-        options.setdefault('separators', (',', ': '))
+        options.setdefault('separators', self.serializer_separators)
+
+        codec = self.codec
+        if not isinstance(self, AutoDict) or not _FRAGMENT_OPTIONS.issuperset(options):
+            return codec.dumps(dict(self), **options)
+
+        with self.read_lock():
+            return _encode_fragment(self, 0, options, codec.dumps, self._raw_members())[0]
+
+
+# noinspection PyProtectedMember
+def _wrap_loaded(parent, key, obj, memo):
+    # under a lazy node, parents are plain dicts
+    return parent._loaded_child(key, obj, memo) if isinstance(parent, AutoDict) else _share_keys(obj, memo)
+
+
+_FRAGMENT_OPTIONS = frozenset(['indent', 'sort_keys', 'separators', 'ensure_ascii'])
+_FROZEN_TYPES = (type(None), bool, float) + string_types + integer_types
+_LEAF_TYPES = frozenset(_FROZEN_TYPES)
+_PLACEHOLDER = '\x00json_config:%s:%d\x00'
+_PLACEHOLDER_RE = re.compile(r'"\\u0000json_config:([0-9a-f]+):(\d+)\\u0000"')
+_random = SystemRandom()
+
+
+# noinspection PyProtectedMember
+def _encode_fragment(node, depth, options, dumps=json.dumps, raw=None, nonce=None):
+    """
+    Encode `node` as it appears `depth` levels into the document.
+
+    Child nodes are encoded first and spliced in through placeholders, so each node is passed through `dumps`
+    once.  Fragments are cached on the node until a write invalidates it (see
+    :meth:`AutoDict._invalidate`).  Nodes holding mutable leaves, like lists, are never cached since they can
+    change without the tree noticing.
+
+    Vivified nodes holding nothing but other such nodes encode to ``None``, and are left out of their parent.
+
+    :param raw: Members to splice in as they are, where `node` has no key of its own.  See
+        :meth:`AutoDict._raw_members`.
+    :param nonce: Marks this encoding's placeholders, so a string value that looks like one is left alone.  Drawn
+        at random for the document when not given.
+    :type node: AutoDict
+    :rtype: (str|None, bool)
+    """
+    cache_key = (depth, options.get('indent'), options.get('sort_keys'), options.get('separators'),
+                 options.get('ensure_ascii', True))
+
+    cache = node._cache_
+    if cache is not None and cache[0] == cache_key and not raw:
+        return cache[1], True
+
+    if nonce is None:
+        nonce = '%016x' % _random.getrandbits(64)
 
-        return json.dumps(dict(self), **options)
+    cacheable = True
+    fragments = []
+    shallow = {}
+    for key, value in dict.items(node):
+        if isinstance(value, AutoDict):
+            fragment, is_cached = _encode_fragment(value, depth + 1, options, dumps, nonce=nonce)
+            cacheable = cacheable and is_cached
+            if fragment is None:
+                continue
+            shallow[key] = _PLACEHOLDER % (nonce, len(fragments))
+            fragments.append(fragment)
+        else:
+            # plain dicts are left by lazy loading, and never handed out (see LazyNodeMixin)
+            cacheable = cacheable and (isinstance(value, _FROZEN_TYPES) or type(value) is dict)
+            shallow[key] = value
+
+    if raw:
+        # not part of the node, and not cached with it
+        cacheable = False
+        for key, fragment in raw.items():
+            if key not in shallow:
+                shallow[key] = _PLACEHOLDER % (nonce, len(fragments))
+                fragments.append(fragment)
+
+    if depth and node._vivified_ and not shallow:
+        # still cached, so storing something under it invalidates the parent's fragment
+        if cacheable:
+            node._cache_ = (cache_key, None)
+        return None, cacheable
+
+    fragment = dumps(shallow, **options)
+
+    indent = options.get('indent')
+    if indent is not None and depth:
+        padding = indent if isinstance(indent, string_types) else ' ' * indent
+        fragment = fragment.replace('\n', '\n' + padding * depth)
+
+    if fragments:
+        fragment = _PLACEHOLDER_RE.sub(
+            lambda match: fragments[int(match.group(2))] if match.group(1) == nonce else match.group(0), fragment)
+
+    if cacheable:
+        node._cache_ = (cache_key, fragment)
+
+    return fragment, cacheable
 
 
 # noinspection PyAbstractClass
@@ -222,21 +1905,99 @@ class AutoConfigBase(AutoSyncMixin, AutoDict):
         super(AutoConfigBase, self).__init__(**kwargs)
 
 
+def _find_serializer(config_file, file_type=None):
+    """
+    The serializer for `file_type`, or for the longest extension of `config_file` one is registered for: a
+    ``'min.json'`` serializer takes ``app.min.json`` over a ``'json'`` one.  Defaults to :class:`PrettyJSONMixin`.
+    """
+    if file_type is not None:
+        exts = [file_type]
+    else:
+        exts = _extensions(os.path.basename(str(config_file)))
+
+    for ext in exts:
+        Serializer = find_serializer(ext)
+        if Serializer is not None:
+            return Serializer
+    return PrettyJSONMixin
+
+
+@lru_cache(maxsize=1024)
+def _extensions(basename):
+    """``'app.min.json'`` -> ``['min.json', 'json']``"""
+    parts = basename.split('.')[1:]
+    return ['.'.join(parts[i:]) for i in range(len(parts))]
+
+
+def _composed_classes(Serializer):
+    """
+    Config classes composed with `Serializer`, by the rest of their bases.  Kept on `Serializer` itself, so they
+    go away with it.
+
+    :rtype: dict
+    """
+    classes = vars(Serializer).get('_composed_')
+    if classes is None:
+        classes = Serializer._composed_ = {}
+    return classes
+
+
 # noinspection PyPep8Naming,PyAbstractClass
-def connect(config_file, file_type=None, **kwargs):
-    if file_type is None:
-        file_type = str(config_file).rsplit('.', 1)[-1]
-
-    try:
-        Serializer = [  # :off
-            cls
-            for cls in AbstractSerializer.__subclasses__()
-            if cls.serializer_ext == file_type
-        ][-1]  # :on
-    except IndexError:
-        Serializer = PrettyJSONMixin
-
-    class Connect(Serializer, AutoConfigBase):
-        pass
+def connect(config_file, file_type=None, lazy=False, shared=False, **kwargs):
+    """
+    Load `config_file` into a config that saves itself on every change.
+
+    :param lazy: Wrap nested dicts into nodes as they're first used, instead of all at once when loading.
+    :param revalidate: Check whether `config_file` changed on reads through the root, at most once per this many
+        seconds, and reload it if it did.
+    :param shared: Hand out the same config to every ``shared`` connection to the same file in this process, for
+        as long as it's in use.
+    :raises ValueError: If a shared config for the file is already connected with other options.
+    """
+    if shared:
+        return _connect_shared(config_file, file_type, lazy, kwargs)
+
+    Serializer = _find_serializer(config_file, file_type)
+
+    classes = _composed_classes(Serializer)
+    revalidate = kwargs.get('revalidate') is not None
+    key = lazy, revalidate, AutoConfigBase
+    Connect = classes.get(key)
+    if Connect is None:
+        if lazy:
+            class Connect(LazyNodeMixin, Serializer, AutoConfigBase):
+                pass
+        else:
+            class Connect(Serializer, AutoConfigBase):
+                pass
+
+        if revalidate:
+            class Connect(RevalidateMixin, Connect):
+                pass
+        Connect = classes.setdefault(key, Connect)
 
     return Connect(config_file, **kwargs)
+
+
+_shared_configs = weakref.WeakValueDictionary()
+""":type _shared_configs: dict[str, AutoConfigBase]"""
+_shared_configs_lock = RLock()
+
+
+def _connect_shared(config_file, file_type, lazy, kwargs):
+    """:func:`connect`, through a pool of live configs keyed by the file's resolved path."""
+    if config_file is None:
+        raise ValueError('Shared configs need a config_file.')
+
+    path = os.path.realpath(config_file)
+    options = file_type, lazy, kwargs
+    with _shared_configs_lock:
+        config = _shared_configs.get(path)
+        if config is None:
+            config = connect(config_file, file_type, lazy, **kwargs)
+            config._shared_options_ = options
+            _shared_configs[path] = config
+        elif config._shared_options_ != options:
+            raise ValueError('%s is already connected, with other options.' % config_file)
+
+    return config
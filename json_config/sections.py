@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Section index, used by :class:`json_config.main.AutoSyncMixin` with ``sections=[...]``.
+
+The index is a sidecar file holding the byte span of each top-level member's value, and the signature of the
+config file it describes.  A loader that needs a few sections seeks straight to them, instead of reading the
+whole file.
+"""
+import json
+import logging
+import re
+from json.decoder import scanstring
+
+from future.utils import string_types
+
+from ._compat import FileNotFoundError
+from .storage import FSYNC_NONE, write_atomic
+
+__all__ = ['index_text', 'scan_index', 'read_index', 'write_index', 'read_members']
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = ' \t\n\r'
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+_decoder = json.JSONDecoder()
+
+
+def index_text(text, indent):
+    """
+    Index a document as it's about to be written, without decoding it.
+
+    Only works for indented documents, where every top-level member starts a line at exactly one level of
+    indentation.  Strings can't hold raw newlines, so nothing else can look like one.
+
+    :return: ``{key: [start, end]}`` byte spans of the values in `text` encoded as utf-8, and that encoding's
+        length.  ``None`` if `text` isn't indented.
+    :rtype: (dict[str, list[int]], int)|None
+    """
+    if indent is None:
+        return None
+
+    padding = indent if isinstance(indent, string_types) else ' ' * indent
+    if not padding:
+        return None
+
+    member_re = re.compile(r'\n' + re.escape(padding) + '"')
+    starts = [match.end() - 1 for match in member_re.finditer(text)]
+    if not starts:
+        return {}, _utf8_len(text)
+
+    members = []
+    for i, start in enumerate(starts):
+        key, end = scanstring(text, start + 1)
+        value_start = _WHITESPACE_RE.match(text, text.index(':', end) + 1).end()
+
+        # back over the separator before the next member, or the closing brace
+        value_end = _rstrip(text, starts[i + 1] if i + 1 < len(starts) else len(text))
+        value_end = _rstrip(text, value_end - 1)
+        members.append((key, value_start, value_end))
+
+    return _to_bytes(text, members)
+
+
+def scan_index(f):
+    """
+    Index the JSON object in the binary file `f`, whatever its layout.  Decodes the whole file.
+
+    :rtype: dict[str, list[int]]
+    :raises ValueError: If `f` doesn't hold a JSON object.
+    """
+    f.seek(0)
+    text = f.read().decode('utf-8')
+
+    pos = _WHITESPACE_RE.match(text, 0).end()
+    if text[pos:pos + 1] != '{':
+        raise ValueError('Expecting a JSON object: char %d' % pos)
+    pos = _WHITESPACE_RE.match(text, pos + 1).end()
+
+    members = []
+    while text[pos:pos + 1] != '}':
+        if members:
+            if text[pos:pos + 1] != ',':
+                raise ValueError("Expecting ',' delimiter: char %d" % pos)
+            pos = _WHITESPACE_RE.match(text, pos + 1).end()
+
+        if text[pos:pos + 1] != '"':
+            raise ValueError('Expecting property name enclosed in double quotes: char %d' % pos)
+        key, pos = scanstring(text, pos + 1)
+
+        pos = _WHITESPACE_RE.match(text, pos).end()
+        if text[pos:pos + 1] != ':':
+            raise ValueError("Expecting ':' delimiter: char %d" % pos)
+        pos = _WHITESPACE_RE.match(text, pos + 1).end()
+
+        _, end = _decoder.raw_decode(text, pos)
+        members.append((key, pos, end))
+        pos = _WHITESPACE_RE.match(text, end).end()
+
+    return _to_bytes(text, members)[0]
+
+
+def read_index(path, signature):
+    """
+    Read the index at `path`, if it describes the file with `signature`.
+
+    :rtype: dict[str, list[int]]|None
+    """
+    try:
+        with open(path) as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        logger.warning('Ignoring corrupt section index %s', path)
+        return None
+
+    if signature is None or index.get('signature') != list(signature):
+        return None
+    return index.get('sections')
+
+
+def write_index(path, signature, spans, fsync=FSYNC_NONE):
+    """Write the index of the file with `signature`.  Best effort: an index that can't be written is rebuilt."""
+    data = json.dumps({'signature': list(signature), 'sections': spans}, separators=(',', ':'))
+    try:
+        write_atomic(path, data, fsync)
+    except (IOError, OSError) as e:
+        logger.warning('Could not write section index %s: %s', path, e)
+
+
+def read_members(f, spans, keys):
+    """
+    Read the raw JSON text of the members `keys` from the binary file `f`.  Missing keys are skipped.
+
+    :rtype: dict[str, str]
+    """
+    members = {}
+    for key in keys:
+        if key not in spans:
+            continue
+        start, end = spans[key]
+        f.seek(start)
+        members[key] = f.read(end - start).decode('utf-8')
+    return members
+
+
+def _rstrip(text, pos):
+    while pos and text[pos - 1] in _WHITESPACE:
+        pos -= 1
+    return pos
+
+
+def _utf8_len(text):
+    return len(text.encode('utf-8'))
+
+
+def _to_bytes(text, members):
+    """Turn the character spans in `members` into byte spans, and add up the length of `text` in bytes."""
+    size = _utf8_len(text)
+    if size == len(text):
+        return dict((key, [start, end]) for key, start, end in members), size
+
+    spans = {}
+    pos = offset = 0
+    for key, start, end in members:
+        offset += _utf8_len(text[pos:start])
+        byte_start = offset
+        offset += _utf8_len(text[start:end])
+        spans[key] = [byte_start, offset]
+        pos = end
+
+    return spans, size
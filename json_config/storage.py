@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""File writing strategies used by :class:`json_config.main.AutoSyncMixin`."""
+import json
+import logging
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
+
+from ._compat import FileNotFoundError, fcntl, replace
+
+__all__ = ['FSYNC_POLICIES', 'write_in_place', 'write_atomic', 'append_journal', 'read_journal', 'remove_journal',
+           'apply_changes', 'file_lock', 'file_signature', 'stat_signature']
+
+logger = logging.getLogger(__name__)
+
+FSYNC_NONE = 'none'
+FSYNC_FILE = 'file'
+FSYNC_FILE_AND_DIR = 'file+dir'
+
+FSYNC_POLICIES = (FSYNC_NONE, FSYNC_FILE, FSYNC_FILE_AND_DIR)
+
+
+def _get_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _get_umask()
+
+
+def write_in_place(path, data, fsync=FSYNC_NONE):
+    """Truncate and rewrite `path`.  Readers may observe a partially written file."""
+    with open(path, 'w') as f:
+        f.write(data)
+
+        if fsync != FSYNC_NONE:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def write_atomic(path, data, fsync=FSYNC_NONE):
+    """
+    Write `data` to a temp file next to `path`, then rename it over `path`.
+
+    Readers see either the old file or the new one, never a partial write.
+
+    :param fsync: ``'none'`` leaves durability to the OS, ``'file'`` syncs the data before the rename, and
+        ``'file+dir'`` additionally syncs the directory so the rename itself survives a power loss.
+    """
+    path = os.path.realpath(path)
+    dirname, basename = os.path.split(path)
+
+    fd, tmp_path = tempfile.mkstemp(prefix='.%s.' % basename, suffix='.tmp', dir=dirname)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(data)
+
+            if fsync != FSYNC_NONE:
+                f.flush()
+                os.fsync(f.fileno())
+
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+
+        replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:  # pragma: no cover
+            pass
+        raise
+
+    if fsync == FSYNC_FILE_AND_DIR:
+        _fsync_dir(dirname)
+
+
+def _fsync_dir(dirname):
+    try:
+        fd = os.open(dirname, os.O_RDONLY)
+    except OSError:  # pragma: no cover
+        # Windows can't open directories, and doesn't need to.
+        return
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def file_signature(path):
+    """
+    Cheap fingerprint of the file at `path`.  Changes when the file is rewritten or replaced.
+
+    :return: ``(mtime, size, inode)``, or ``None`` if there's no file.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return stat_signature(st)
+
+
+def stat_signature(st):
+    """:func:`file_signature` from the ``os.stat`` result `st`."""
+    return getattr(st, 'st_mtime_ns', st.st_mtime), st.st_size, st.st_ino
+
+
+@contextmanager
+def file_lock(path, exclusive=True):
+    """
+    Hold an advisory ``flock`` on `path`, creating it if needed.
+
+    Lock a sidecar file, not the data file itself: atomic saves replace the data file, and a lock on the old
+    inode guards nothing.
+    """
+    if fcntl is None:  # pragma: no cover
+        raise RuntimeError('File locking requires fcntl, which is not available on this platform.')
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666 & ~_UMASK)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
+# JOURNAL
+# ----------------------------------------------------------------------------
+# One JSON record per line: ``["set", path, value]`` or ``["del", path]``, where `path` is the list of keys
+# from the root.  An empty path replaces the whole document.
+
+def append_journal(path, records, fsync=FSYNC_NONE):
+    """
+    Append `records` to the journal at `path`.
+
+    :type records: list[list]
+    :return: Number of bytes written.
+    :rtype: int
+    """
+    data = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+
+    with open(path, 'a') as f:
+        f.write(data)
+
+        if fsync != FSYNC_NONE:
+            f.flush()
+            os.fsync(f.fileno())
+
+    return len(data)
+
+
+def read_journal(path):
+    """
+    Read every complete record from the journal at `path`.
+
+    Reading stops at the first record that can't be decoded, such as a line torn by a crash mid-append.
+
+    :return: The records, and the size of the journal in bytes.
+    :rtype: (list[list], int)
+    """
+    records = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning('Ignoring corrupt journal record in %s: %r', path, line)
+                    break
+    except FileNotFoundError:
+        return records, 0
+
+    return records, os.path.getsize(path)
+
+
+def remove_journal(path):
+    try:
+        os.remove(path)
+    except OSError:
+        if os.path.exists(path):  # pragma: no cover
+            raise
+
+
+def apply_changes(obj, records):
+    """
+    Replay journal `records` onto the plain dict `obj`, in place.
+
+    :type obj: dict
+    :type records: list[list]
+    """
+    for record in records:
+        op, keys = record[0], record[1]
+
+        if op == 'set' and not keys:
+            obj.clear()
+            obj.update(record[2])
+            continue
+
+        node = obj
+        for key in keys[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                if op == 'del':
+                    break
+                child = node[key] = {}
+            node = child
+        else:
+            if op == 'set':
+                node[keys[-1]] = record[2]
+            else:
+                node.pop(keys[-1], None)
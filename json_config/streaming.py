@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Incremental JSON loading, used by :class:`json_config.main.AutoSyncMixin` with ``streaming=True``.
+
+The file is read in chunks and decoded straight into the tree, so the whole text is never held at once.  Values
+that fit in the buffer are decoded by :mod:`json`'s own scanner; only the containers spanning a chunk boundary
+are walked here.
+"""
+import json
+import re
+from json.decoder import scanstring
+
+__all__ = ['CHUNK_SIZE', 'load_into']
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+_NUMBER_RE = re.compile(r'(-?(?:0|[1-9]\d*))(\.\d+)?([eE][-+]?\d+)?')
+_NUMBER_CHARS_RE = re.compile(r'[-+.eE0-9]*')
+_CONSTANTS = {
+    'null': None,
+    'true': True,
+    'false': False,
+    'NaN': float('nan'),
+    'Infinity': float('inf'),
+    '-Infinity': float('-inf'),
+}
+_CONSTANT_MAX_LEN = max(len(name) for name in _CONSTANTS)
+_CLOSE = {True: '}', False: ']'}
+
+_decoder = json.JSONDecoder()
+
+
+def load_into(f, root, wrap, chunk_size=CHUNK_SIZE):
+    """
+    Decode the JSON object in the text file `f` into the empty mapping `root`.
+
+    :param wrap: ``wrap(parent, key, obj, memo)`` returns what to store under `key` for the decoded dict `obj`.
+        `obj` may still be empty, in which case it's filled after.  Not called for dicts inside lists, which stay
+        plain dicts.  `memo` holds the keys seen so far; sharing equal keys through it saves as much memory as
+        :func:`json.loads` does.
+    :raises ValueError: If `f` doesn't hold a JSON object.
+    """
+    reader = _Reader(f, chunk_size)
+    reader.expect('{')
+
+    memo = {}
+
+    # (container, is_object, is_plain)
+    stack = [(root, True, False)]
+    is_first = True
+    while stack:
+        container, is_object, is_plain = stack[-1]
+        char = reader.peek()
+
+        if char == _CLOSE[is_object]:
+            reader.pos += 1
+            stack.pop()
+            is_first = False
+            continue
+
+        if not is_first:
+            reader.expect(',')
+        is_first = False
+
+        key = None
+        if is_object:
+            if reader.peek() != '"':
+                raise reader.error('Expecting property name enclosed in double quotes')
+            key = reader.string()
+            key = memo.setdefault(key, key)
+            reader.expect(':')
+
+        char = reader.peek()
+        if char == '{' or char == '[':
+            value, is_complete = reader.container()
+            is_child_plain = is_plain or not is_object
+            if char == '{' and not is_child_plain:
+                value = wrap(container, key, value, memo)
+            if not is_complete:
+                stack.append((value, char == '{', is_child_plain))
+                is_first = True
+        else:
+            value = reader.scalar()
+
+        if is_object:
+            dict.__setitem__(container, key, value)
+        else:
+            container.append(value)
+
+    if reader.peek() != '':
+        raise reader.error('Extra data')
+
+
+class _Reader(object):
+    """A window onto `f`, refilled as the parser moves along."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.offset = 0
+        self.eof = False
+
+    def fill(self):
+        """Read more.  Reads grow with the window, so re-scanning a long value stays linear."""
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return
+
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """The next character past any whitespace, or ``''`` at the end of the file."""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                return ''
+            self.fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise self.error('Expecting %r delimiter' % char)
+        self.pos += 1
+
+    def string(self):
+        while True:
+            try:
+                value, end = scanstring(self.buf, self.pos + 1)
+            except ValueError:
+                # unterminated, or cut in the middle of an escape
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+    def scalar(self):
+        char = self.peek()
+        if char == '"':
+            return self.string()
+
+        while not self.eof and len(self.buf) - self.pos <= _CONSTANT_MAX_LEN:
+            self.fill()
+
+        for name, value in _CONSTANTS.items():
+            if self.buf.startswith(name, self.pos):
+                self.pos += len(name)
+                return value
+
+        # the number may go on in the next chunk, even past a trailing '.', 'e' or sign
+        while not self.eof and _NUMBER_CHARS_RE.match(self.buf, self.pos).end() == len(self.buf):
+            self.fill()
+
+        match = _NUMBER_RE.match(self.buf, self.pos)
+        if match is None:
+            raise self.error('Expecting value')
+
+        self.pos = match.end()
+        integer, fraction, exponent = match.groups()
+        if fraction or exponent:
+            return float(integer + (fraction or '') + (exponent or ''))
+        return int(integer)
+
+    def container(self):
+        """
+        Decode the object or array starting here in one go, if it ends inside the window.  Otherwise step into it,
+        and return an empty one to fill.
+
+        :rtype: (dict|list, bool)
+        """
+        try:
+            value, end = _decoder.raw_decode(self.buf, self.pos)
+        except ValueError:
+            empty = {} if self.buf[self.pos] == '{' else []
+            self.pos += 1
+            return empty, False
+
+        self.pos = end
+        return value, True
+
+    def error(self, message):
+        return ValueError('%s: char %d' % (message, self.offset + self.pos))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""Change subscriptions for :meth:`json_config.main.AutoDict.subscribe`."""
+import logging
+
+__all__ = ['WILDCARD', 'SubscriptionIndex', 'NotifyingMutex', 'notify']
+
+logger = logging.getLogger(__name__)
+
+WILDCARD = '*'
+"""A pattern key that matches any one key."""
+
+
+class _Node(object):
+    __slots__ = ('children', 'callbacks')
+
+    def __init__(self):
+        self.children = {}
+        """:type children: dict[object, _Node]"""
+        self.callbacks = []
+
+
+class SubscriptionIndex(object):
+    """
+    Callbacks by path pattern, in a trie with one level per key.
+
+    A pattern matches changes at or below it, and changes above it (replacing a whole section changes everything
+    in it).  Matching a path walks it once, so the cost grows with the path's depth and the number of matches,
+    not with the number of subscriptions.
+
+    >>> index = SubscriptionIndex()
+    >>> index.add(('services', WILDCARD, 'url'), len)
+    >>> index.match(('services', 'billing', 'url', 'host')) == [len]
+    True
+    >>> index.match(('services', 'billing', 'timeout'))
+    []
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def __len__(self):
+        return sum(len(node.callbacks) for node in _walk(self._root))
+
+    def add(self, keys, callback):
+        node = self._root
+        for key in keys:
+            node = node.children.setdefault(key, _Node())
+        node.callbacks.append(callback)
+
+    def remove(self, keys, callback):
+        """:raises ValueError: If `callback` isn't subscribed to `keys`."""
+        nodes = [self._root]
+        for key in keys:
+            child = nodes[-1].children.get(key)
+            if child is None:
+                raise ValueError('%r is not subscribed to %r' % (callback, keys))
+            nodes.append(child)
+
+        nodes[-1].callbacks.remove(callback)
+
+        # prune branches left empty
+        for key, parent, node in reversed(list(zip(keys, nodes, nodes[1:]))):
+            if node.callbacks or node.children:
+                break
+            del parent.children[key]
+
+    def match(self, path):
+        """Callbacks subscribed to `path`, to a pattern above it, or to a pattern below it."""
+        callbacks = []
+        frontier = [self._root]
+        for key in path:
+            following = []
+            for node in frontier:
+                callbacks.extend(node.callbacks)
+
+                child = node.children.get(key)
+                if child is not None:
+                    following.append(child)
+                wildcard = node.children.get(WILDCARD)
+                if wildcard is not None and wildcard is not child:
+                    following.append(wildcard)
+
+            frontier = following
+            if not frontier:
+                return callbacks
+
+        for node in frontier:
+            for below in _walk(node):
+                callbacks.extend(below.callbacks)
+        return callbacks
+
+
+def _walk(node):
+    nodes = [node]
+    while nodes:
+        node = nodes.pop()
+        yield node
+        nodes.extend(node.children.values())
+
+
+class NotifyingMutex(object):
+    """
+    A root's mutex, that runs the root's subscriptions after the outermost holder releases it.
+
+    Changes made while it's held, by a single call or by a whole :meth:`~json_config.main.TraceRootMixin.lock`
+    group, are reported together.  Callbacks run outside the mutex, on the thread that made the changes.
+    """
+    __slots__ = ('_root',)
+
+    def __init__(self, root):
+        self._root = root
+
+    def __enter__(self):
+        root = self._root
+        root._mutex_.acquire()
+        root._hold_depth_ += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        root = self._root
+        calls = None
+        try:
+            root._hold_depth_ -= 1
+            if not root._hold_depth_:
+                calls = root._take_notices()
+        finally:
+            root._mutex_.release()
+
+        if calls:
+            notify(calls)
+
+
+def notify(calls):
+    """
+    Run ``callback(paths)`` for each pair in `calls`.  A failing callback is logged, and doesn't stop the rest.
+
+    :type calls: list[(callable, list[tuple])]
+    """
+    for callback, paths in calls:
+        try:
+            callback(paths)
+        except Exception:
+            logger.exception('Subscriber %r failed', callback)
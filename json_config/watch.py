@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""Reload configs when another process changes their file.  See :meth:`json_config.main.AutoSyncMixin.reload`."""
+import atexit
+import ctypes
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import weakref
+
+from .storage import file_signature
+
+__all__ = ['Watcher', 'PollingWatcher', 'InotifyWatcher', 'default_watcher']
+
+logger = logging.getLogger(__name__)
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# a file written in place, or renamed (or symlinked) into place
+_MASK = IN_CLOSE_WRITE | IN_MOVED_TO
+
+_EVENT = struct.Struct('iIII')
+""":type _EVENT: struct.Struct"""
+
+
+class Watcher(object):
+    """
+    Watch config files from one thread, and tell each config when its file may have changed.
+
+    Configs decide for themselves whether to reload: one whose file is the one it last read or wrote ignores the
+    call.  Configs are held weakly, so a watched config that's no longer used is freed as usual.
+    """
+
+    def __init__(self, name='json_config-watcher'):
+        self.name = name
+
+        self._mutex = threading.RLock()
+        self._configs = {}
+        """:type _configs: dict[str, dict[int, weakref.ref]]"""
+        self._thread = None
+        self._closed = False
+
+        self.checks = 0
+        self.reloads = 0
+        self.failures = 0
+
+        _watchers.add(self)
+
+    def stats(self):
+        """
+        How many files are watched, and how often configs were told to check them.
+
+        :rtype: dict
+        """
+        with self._mutex:
+            return {
+                'files': len(self._configs),
+                'checks': self.checks,
+                'reloads': self.reloads,
+                'failures': self.failures,
+            }
+
+    def watch(self, config):
+        """Start watching `config`'s file."""
+        path = os.path.abspath(config.config_file)
+
+        with self._mutex:
+            if self._closed:
+                raise RuntimeError('Watcher is closed.')
+
+            refs = self._configs.get(path)
+            if refs is None:
+                self._add_path(path)
+                refs = self._configs[path] = {}
+            refs[id(config)] = weakref.ref(config)
+
+            self._start()
+
+    def unwatch(self, config):
+        """Stop watching `config`'s file."""
+        path = os.path.abspath(config.config_file)
+
+        with self._mutex:
+            refs = self._configs.get(path)
+            if refs is not None and refs.pop(id(config), None) is not None and not refs:
+                self._drop_path(path)
+
+    def close(self, timeout=None):
+        """Stop the thread.  Returns ``False`` if `timeout` expired first."""
+        with self._mutex:
+            self._closed = True
+            thread = self._thread
+
+        self._wake()
+
+        if thread is None:
+            return True
+
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _start(self):
+        if self._thread is not None:
+            return
+
+        self._thread = thread = threading.Thread(target=self._run, name=self.name)
+        thread.daemon = True
+        thread.start()
+
+    def _drop_path(self, path):
+        del self._configs[path]
+        self._remove_path(path)
+
+    def _notify(self, paths):
+        """Tell the configs watching `paths` to check their file."""
+        configs = []
+        with self._mutex:
+            for path in paths:
+                refs = self._configs.get(path)
+                if refs is None:
+                    continue
+
+                for key, ref in list(refs.items()):
+                    config = ref()
+                    if config is None:
+                        del refs[key]
+                    else:
+                        configs.append(config)
+
+                if not refs:
+                    self._drop_path(path)
+
+        for config in configs:
+            try:
+                is_reloaded = config._file_changed()
+            except Exception:
+                logger.exception('Reloading %s failed', config.config_file)
+                with self._mutex:
+                    self.checks += 1
+                    self.failures += 1
+            else:
+                with self._mutex:
+                    self.checks += 1
+                    self.reloads += bool(is_reloaded)
+
+    def _add_path(self, path):
+        raise NotImplementedError  # pragma: no cover
+
+    def _remove_path(self, path):
+        raise NotImplementedError  # pragma: no cover
+
+    def _wake(self):
+        raise NotImplementedError  # pragma: no cover
+
+    def _run(self):
+        raise NotImplementedError  # pragma: no cover
+
+
+class PollingWatcher(Watcher):
+    """Stat every watched file each `interval` seconds.  Works everywhere."""
+
+    def __init__(self, interval=0.5, name='json_config-watcher'):
+        super(PollingWatcher, self).__init__(name)
+        self.interval = interval
+
+        self._signatures = {}
+        self._closing = threading.Event()
+
+    def _add_path(self, path):
+        self._signatures[path] = file_signature(path)
+
+    def _remove_path(self, path):
+        self._signatures.pop(path, None)
+
+    def _wake(self):
+        self._closing.set()
+
+    def _run(self):
+        while not self._closed:
+            self._closing.wait(self.interval)
+
+            with self._mutex:
+                signatures = list(self._signatures.items())
+
+            changed = []
+            for path, signature in signatures:
+                current = file_signature(path)
+                if current != signature:
+                    changed.append(path)
+                    with self._mutex:
+                        if path in self._signatures:
+                            self._signatures[path] = current
+
+            if changed:
+                self._notify(changed)
+
+
+class InotifyWatcher(Watcher):
+    """
+    Sleep until Linux's inotify reports a write to a watched file's directory.  Costs no CPU while idle.
+
+    Directories are watched rather than files, so files replaced by a rename (as atomic saves and most editors
+    do) stay watched.  For a symlink, both its directory and its target's are watched.
+
+    :raises OSError: If inotify isn't available.
+    """
+
+    def __init__(self, name='json_config-watcher'):
+        self._inotify = inotify = _load_inotify()
+        if inotify is None:
+            raise OSError(errno.ENOSYS, 'inotify is not available')
+
+        self._fd = _check(inotify.inotify_init1(IN_NONBLOCK | IN_CLOEXEC))
+        self._wake_r, self._wake_w = os.pipe()
+        self._dirs = {}
+        """:type _dirs: dict[str, int]"""
+        self._path_dirs = {}
+        """:type _path_dirs: dict[str, frozenset[str]]"""
+
+        super(InotifyWatcher, self).__init__(name)
+
+    def close(self, timeout=None):
+        is_closed = super(InotifyWatcher, self).close(timeout)
+        if is_closed and self._fd is not None:
+            for fd in (self._fd, self._wake_r, self._wake_w):
+                os.close(fd)
+            self._fd = None
+        return is_closed
+
+    def _add_path(self, path):
+        dirs = frozenset([os.path.dirname(path), os.path.dirname(os.path.realpath(path))])
+        for directory in dirs:
+            if directory not in self._dirs:
+                self._dirs[directory] = _check(self._inotify.inotify_add_watch(self._fd, _encode(directory), _MASK))
+        self._path_dirs[path] = dirs
+
+    def _remove_path(self, path):
+        dirs = self._path_dirs.pop(path)
+        in_use = frozenset().union(*self._path_dirs.values())
+
+        for directory in dirs.difference(in_use):
+            wd = self._dirs.pop(directory)
+            # the same directory may be watched under another name
+            if wd not in self._dirs.values():
+                self._inotify.inotify_rm_watch(self._fd, wd)
+
+    def _wake(self):
+        if self._fd is not None:
+            os.write(self._wake_w, b'x')
+
+    def _run(self):
+        while not self._closed:
+            try:
+                select.select([self._fd, self._wake_r], [], [])
+                data = os.read(self._fd, 64 * 1024)
+            except (OSError, select.error) as e:
+                if e.args[0] in (errno.EINTR, errno.EAGAIN):
+                    continue
+                raise
+
+            wds = _parse_events(data)
+            with self._mutex:
+                paths = [path for path, dirs in self._path_dirs.items()
+                         if wds is None or any(self._dirs[directory] in wds for directory in dirs)]
+
+            if paths:
+                self._notify(paths)
+
+
+def _parse_events(data):
+    """
+    Watch descriptors that saw an event in the inotify record buffer `data`.
+
+    :return: The descriptors, or ``None`` if the kernel dropped events, so anything may have changed.
+    :rtype: set[int]|None
+    """
+    wds = set()
+    offset = 0
+    while offset < len(data):
+        wd, mask, _, length = _EVENT.unpack_from(data, offset)
+        offset += _EVENT.size + length
+
+        if mask & IN_Q_OVERFLOW:
+            return None
+        wds.add(wd)
+    return wds
+
+
+def _check(result):
+    if result < 0:
+        error = ctypes.get_errno()
+        raise OSError(error, os.strerror(error))
+    return result
+
+
+def _encode(path):
+    if isinstance(path, bytes):
+        return path  # pragma: no cover
+    return path.encode(sys.getfilesystemencoding())
+
+
+_inotify = []
+
+
+def _load_inotify():
+    """libc, if it has inotify."""
+    if not _inotify:
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            libc.inotify_init1.argtypes = [ctypes.c_int]
+            libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+            libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        except (AttributeError, OSError, TypeError):  # pragma: no cover
+            # not Linux
+            libc = None
+        _inotify.append(libc)
+    return _inotify[0]
+
+
+_watchers = weakref.WeakSet()
+_default_watcher = []
+_default_watcher_lock = threading.Lock()
+
+
+def default_watcher():
+    """The watcher shared by configs connected with ``watch=True``: inotify where there is one, polling otherwise."""
+    with _default_watcher_lock:
+        if not _default_watcher:
+            try:
+                watcher = InotifyWatcher()
+            except OSError:
+                watcher = PollingWatcher()
+            _default_watcher.append(watcher)
+        return _default_watcher[0]
+
+
+@atexit.register
+def _close_watchers():
+    for watcher in list(_watchers):
+        watcher.close(0)
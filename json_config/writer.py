@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""Background persistence for :class:`json_config.main.AutoSyncMixin`."""
+import atexit
+import logging
+import threading
+import weakref
+from collections import deque
+
+from ._compat import monotonic
+
+__all__ = ['BackgroundWriter', 'default_writer']
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriter(object):
+    """
+    Run writes on a dedicated thread.
+
+    Each write is submitted under a key, one per config file.  A write submitted while an older one for the same
+    key is still queued replaces it, so a burst of saves costs one write.  Once `max_pending` keys are queued,
+    :meth:`submit` blocks until the thread catches up.
+    """
+
+    def __init__(self, max_pending=64, name='json_config-writer'):
+        self.max_pending = max_pending
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._pending = {}
+        self._in_flight = None
+        self._errors = {}
+        self._thread = None
+        self._closed = False
+
+        self.submitted = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.blocked = 0
+        self.failures = 0
+        self.max_depth = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+        _writers.add(self)
+
+    @property
+    def depth(self):
+        """Number of writes waiting to run."""
+        return len(self._queue)
+
+    def stats(self):
+        """
+        Queue depth and latency counters.
+
+        Latency is measured from :meth:`submit` to the end of the write, in seconds.
+
+        :rtype: dict
+        """
+        with self._cond:
+            return {
+                'depth': len(self._queue),
+                'max_depth': self.max_depth,
+                'submitted': self.submitted,
+                'writes': self.writes,
+                'coalesced': self.coalesced,
+                'blocked': self.blocked,
+                'failures': self.failures,
+                'last_latency': self.last_latency,
+                'max_latency': self.max_latency,
+                'avg_latency': self._total_latency / self.writes if self.writes else 0.0,
+            }
+
+    def submit(self, key, write, *args):
+        """Queue ``write(*args)``, replacing any queued write for `key`."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('Writer is closed.')
+
+            self.submitted += 1
+
+            if key in self._pending:
+                self.coalesced += 1
+                self._pending[key] = (write, args, self._pending[key][2])
+                return
+
+            if len(self._queue) >= self.max_pending:
+                self.blocked += 1
+                while len(self._queue) >= self.max_pending:
+                    self._cond.wait()
+
+            self._pending[key] = (write, args, monotonic())
+            self._queue.append(key)
+            self.max_depth = max(self.max_depth, len(self._queue))
+
+            self._start()
+            self._cond.notify_all()
+
+    def flush(self, key=None, timeout=None):
+        """
+        Wait for queued writes to finish.
+
+        :param key: Only wait for this key's write.  Waits for everything by default.
+        :return: ``False`` if `timeout` expired first.
+        :raises Exception: The error raised by the last failed write for `key`.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+
+        with self._cond:
+            while self._is_busy(key):
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+            if key is not None and key in self._errors:
+                raise self._errors.pop(key)
+
+        return True
+
+    def close(self, timeout=None):
+        """Finish queued writes and stop the thread.  Returns ``False`` if `timeout` expired first."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+
+        if thread is None:
+            return True
+
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _is_busy(self, key):
+        if key is None:
+            return bool(self._queue) or self._in_flight is not None
+
+        return key in self._pending or self._in_flight == key
+
+    def _start(self):
+        if self._thread is not None:
+            return
+
+        self._thread = thread = threading.Thread(target=self._run, name=self.name)
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+
+                if not self._queue:
+                    self._thread = None
+                    return
+
+                key = self._in_flight = self._queue.popleft()
+                write, args, submitted_at = self._pending.pop(key)
+                self._cond.notify_all()
+
+            error = None
+            try:
+                write(*args)
+            except Exception as e:
+                logger.exception('Background write failed: %r', key)
+                error = e
+
+            with self._cond:
+                latency = monotonic() - submitted_at
+                self._in_flight = None
+
+                if error is None:
+                    self.writes += 1
+                    self.last_latency = latency
+                    self.max_latency = max(self.max_latency, latency)
+                    self._total_latency += latency
+                    self._errors.pop(key, None)
+                else:
+                    self.failures += 1
+                    self._errors[key] = error
+
+                self._cond.notify_all()
+
+
+_writers = weakref.WeakSet()
+_default_writer = []
+_default_writer_lock = threading.Lock()
+
+
+def default_writer():
+    """The writer shared by configs connected with ``background=True``."""
+    with _default_writer_lock:
+        if not _default_writer:
+            _default_writer.append(BackgroundWriter())
+        return _default_writer[0]
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_writers):
+        writer.close()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture, raises
+
+from json_config import main
+from json_config.main import AutoDict, connect
+
+CONFIG = 'config.json'
+
+
+@fixture
+def sample():
+    _sample = AutoDict()
+    _sample['database']['host'] = 'localhost'
+    _sample['hosts']['example.com'] = 'up'
+    return _sample
+
+
+def test_get_path_splits_dotted_paths(sample):
+    assert sample.get_path('database.host') == 'localhost'
+    assert sample.get_path('database') is sample['database']
+    assert sample.get_path('') is sample
+    assert sample.get_path('database.port', 5432) == 5432
+    assert sample.get_path(('hosts', 'example.com')) == 'up'
+
+    assert 'port' not in sample['database']
+
+
+def test_has_path(sample):
+    assert sample.has_path('database.host')
+    assert sample.has_path(['hosts', 'example.com'])
+    assert not sample.has_path('database.port')
+    assert not sample.has_path('database.host.name')
+
+    assert 'port' not in sample['database']
+
+
+def test_set_path_creates_sections(sample):
+    sample.set_path('cache.redis.port', 6379)
+    sample.set_path('database.host', 'replica')
+    sample.set_path(('hosts', 'example.org'), 'down')
+
+    assert sample['cache'] == {'redis': {'port': 6379}}
+    assert sample['database']['host'] == 'replica'
+    assert sample['hosts']['example.org'] == 'down'
+    # noinspection PyProtectedMember
+    assert sample['cache']['redis']._parent is sample['cache']
+
+
+def test_set_path_refuses_to_replace_leaves_on_the_way(sample):
+    sample['database']['ports'] = [5432]
+
+    with raises(TypeError):
+        sample.set_path('database.host.name', 'localhost')
+    with raises(TypeError):
+        sample.set_path('database.ports.primary', 5432)
+
+    assert sample['database'] == {'host': 'localhost', 'ports': [5432]}
+
+
+def test_set_path_refuses_an_empty_path(sample):
+    with raises(ValueError):
+        sample.set_path('', 'value')
+
+
+def test_del_path(sample):
+    sample.del_path('hosts.example.com'.split('.', 1))
+
+    assert 'hosts' not in sample
+
+    with raises(KeyError):
+        sample.del_path('database.port')
+
+    with raises(KeyError):
+        sample.del_path('database.host.name')
+
+
+def test_set_path_saves_once(tmpdir, mocker):
+    """
+    :type tmpdir: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(tmpdir.join(CONFIG).strpath)
+    write_atomic = mocker.patch.object(main, 'write_atomic', wraps=main.write_atomic)
+
+    config.set_path('a.b.c.d', 'value')
+
+    assert write_atomic.call_count == 1
+    assert json.loads(tmpdir.join(CONFIG).read()) == {'a': {'b': {'c': {'d': 'value'}}}}
+
+
+def test_set_path_is_journaled(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = connect(tmpdir.join(CONFIG).strpath, journal=True)
+    config['existing'] = 'value'
+
+    config.set_path('a.b.c', 'value')
+    config.set_path('a.b.d', 'other')
+
+    assert connect(tmpdir.join(CONFIG).strpath, journal=True) == config
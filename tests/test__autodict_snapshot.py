@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+import pickle
+import threading
+
+from pytest import fixture, mark, raises
+
+from json_config.main import AutoDict, FrozenConfig, connect
+
+parametrize = mark.parametrize
+
+DATA = {
+    'database': {'host': 'localhost', 'port': 5432, 'options': {'ssl': True}},
+    'cache': {'ttl': 60},
+    'hosts': ['a', 'b'],
+}
+
+
+@fixture
+def config():
+    return AutoDict(json.loads(json.dumps(DATA)))
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join('config.json')
+    _config_file.write(json.dumps(DATA))
+    return _config_file
+
+
+def test_a_frozen_copy(config):
+    snapshot = config.snapshot()
+
+    assert type(snapshot) is FrozenConfig
+    assert type(snapshot['database']['options']) is FrozenConfig
+    assert snapshot == config == DATA
+    assert json.loads(json.dumps(snapshot)) == DATA
+
+
+def test_later_changes_are_not_seen(config):
+    snapshot = config.snapshot()
+
+    config['database']['host'] = 'replica'
+    config['hosts'].append('c')
+    del config['cache']
+
+    assert snapshot == DATA
+
+
+@parametrize('change', [
+    lambda snapshot: snapshot.__setitem__('cache', {}),
+    lambda snapshot: snapshot['database'].__delitem__('host'),
+    lambda snapshot: snapshot['database'].update(port=1),
+    lambda snapshot: snapshot.pop('cache'),
+    lambda snapshot: snapshot.setdefault('new', 1),
+    lambda snapshot: snapshot.clear(),
+    lambda snapshot: snapshot['hosts'].append('c'),
+])
+def test_immutable(config, change):
+    snapshot = config.snapshot()
+
+    with raises((TypeError, AttributeError)):
+        change(snapshot)
+    assert snapshot == DATA
+
+
+def test_hashable(config):
+    first = config.snapshot()
+    config['database']['host'] = 'replica'
+    second = config.snapshot()
+    config['database']['host'] = 'localhost'
+
+    assert hash(first) == hash(config.snapshot())
+    assert len(set([first, second, config.snapshot()])) == 2
+
+
+def test_unchanged_sections_are_shared(config):
+    first = config.snapshot()
+    config['database']['options']['ssl'] = False
+    second = config.snapshot()
+
+    assert second['cache'] is first['cache']
+    assert second['database'] is not first['database']
+    assert second['database']['options'] == {'ssl': False}
+    assert config.snapshot()['database'] is second['database']
+
+
+def test_sections_holding_lists_are_copied_each_time(config):
+    # a list can change without the tree noticing
+    assert config.snapshot() is not config.snapshot()
+    assert config['database'].snapshot() is config['database'].snapshot()
+
+
+def test_only_the_changed_spine_is_copied(config, mocker):
+    """:type mocker: pytest_mock.MockFixture"""
+    config.snapshot()
+    frozen = mocker.spy(FrozenConfig, '__init__')
+
+    config['database']['host'] = 'replica'
+    config.snapshot()
+
+    # the root and database, not cache or database.options
+    assert frozen.call_count == 2
+
+
+def test_sections_made_by_reads_are_left_out(config):
+    config['features']['beta']
+
+    assert config.snapshot() == DATA
+    config['features']['beta']['enabled'] = True
+    assert config.snapshot()['features'] == {'beta': {'enabled': True}}
+
+
+def test_of_a_section(config):
+    snapshot = config['database'].snapshot()
+
+    assert snapshot == DATA['database']
+    assert config.snapshot()['database'] is snapshot
+
+
+def test_pickle(config):
+    snapshot = config.snapshot()
+    copy = pickle.loads(pickle.dumps(snapshot))
+
+    assert copy == snapshot
+    assert type(copy['database']) is FrozenConfig
+
+
+@parametrize('lazy', [False, True])
+def test_reloads(config_file, lazy):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, lazy=lazy)
+    first = config.snapshot()
+
+    config_file.write(json.dumps(dict(DATA, cache={'ttl': 0})))
+    config.reload()
+    second = config.snapshot()
+
+    assert first == DATA
+    assert second['cache'] == {'ttl': 0}
+    assert second['database'] == first['database']
+    if not lazy:
+        assert second['database'] is first['database']
+
+
+def test_safe_to_read_while_the_config_changes(config):
+    def write():
+        for n in range(2000):
+            config['database']['port'] = n
+            config['cache'] = {'ttl': n}
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while writer.is_alive():
+        snapshot = config.snapshot()
+        assert set(snapshot) == set(DATA)
+        assert snapshot['database']['host'] == 'localhost'
+    writer.join()
+
+    assert config.snapshot()['cache'] == {'ttl': 1999}
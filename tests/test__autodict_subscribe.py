@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+import threading
+
+from pytest import fixture, raises
+
+from json_config.main import AutoDict, connect
+from json_config.subscriptions import SubscriptionIndex
+
+
+class Recorder(object):
+    """A callback that keeps the paths of each call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, paths):
+        self.calls.append(paths)
+
+
+@fixture
+def config():
+    _config = AutoDict()
+    _config.update({'database': {'host': 'localhost', 'port': 5432}, 'services': {'billing': {'url': 'a'}}})
+    return _config
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join('config.json')
+    _config_file.write(json.dumps({'database': {'host': 'localhost'}, 'cache': {'ttl': 60}}))
+    return _config_file
+
+
+def test_changes_in_a_section(config):
+    database = config.subscribe('database.*', Recorder())
+
+    config['database']['host'] = 'replica'
+    del config['database']['port']
+    config['services']['billing']['url'] = 'b'
+
+    assert database.calls == [[('database', 'host')], [('database', 'port')]]
+
+
+def test_changes_above_and_below(config):
+    database, port = config.subscribe('database', Recorder()), config.subscribe('database.port', Recorder())
+
+    config['database']['host'] = 'replica'
+    config['database'] = {'port': 5433}
+    del config['database']
+
+    assert database.calls == [[('database', 'host')], [('database',)], [('database',)]]
+    assert port.calls == [[('database',)], [('database',)]]
+
+
+def test_wildcards(config):
+    urls = config.subscribe('services.*.url', Recorder())
+
+    config['services']['billing']['url'] = 'b'
+    config['services']['billing']['timeout'] = 1
+    config['services']['search'] = {'url': 'c'}
+
+    assert urls.calls == [[('services', 'billing', 'url')], [('services', 'search')]]
+
+
+def test_relative_to_the_node(config):
+    database = config['database'].subscribe('host', Recorder())
+
+    config['database']['host'] = 'replica'
+
+    assert database.calls == [[('database', 'host')]]
+
+
+def test_one_call_per_group(config):
+    everything = config.subscribe('', Recorder())
+
+    config.update({'a': 1, 'b': {'c': 2}})
+    with config.lock():
+        config['database']['host'] = 'replica'
+        config['database']['host'] = 'primary'
+        config.set_path('x.y', 1)
+
+    assert everything.calls == [
+        [('a',), ('b',)],
+        [('database', 'host'), ('x',), ('x', 'y')],
+    ]
+
+
+def test_reading_is_not_a_change(config):
+    everything = config.subscribe('', Recorder())
+
+    config['missing']['section']
+    config.get_path('database.host')
+
+    assert not everything.calls
+
+
+def test_callbacks_run_outside_the_lock(config):
+    def callback(paths):
+        # deadlocks if we still held the lock
+        thread = threading.Thread(target=config.__setitem__, args=('other', 1))
+        thread.start()
+        thread.join(1)
+        results.append(thread.is_alive())
+
+    results = []
+    config.subscribe('database', callback)
+    config['database']['host'] = 'replica'
+
+    assert results == [False]
+    assert config['other'] == 1
+
+
+def test_failing_callbacks_do_not_stop_the_rest(config):
+    def fail(paths):
+        raise RuntimeError
+
+    config.subscribe('database', fail)
+    database = config.subscribe('database', Recorder())
+
+    config['database']['host'] = 'replica'
+
+    assert database.calls == [[('database', 'host')]]
+
+
+def test_unsubscribe(config):
+    database = config.subscribe('database', Recorder())
+    config.unsubscribe(('database',), database)
+
+    config['database']['host'] = 'replica'
+
+    assert not database.calls
+    with raises(ValueError):
+        config.unsubscribe('database', database)
+    with raises(ValueError):
+        AutoDict().unsubscribe('database', database)
+
+
+def test_one_call_per_batch(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    everything = config.subscribe('', Recorder())
+
+    with config.batch():
+        config['database']['host'] = 'replica'
+        config['cache']['ttl'] = 0
+        assert not everything.calls
+
+    assert everything.calls == [[('database', 'host'), ('cache', 'ttl')]]
+
+
+def test_reloads(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    database, cache = config.subscribe('database', Recorder()), config.subscribe('cache', Recorder())
+
+    config_file.write(json.dumps({'database': {'host': 'replica'}, 'cache': {'ttl': 60}}))
+    config.reload()
+    config.reload()
+
+    assert database.calls == [[('database', 'host')]]
+    assert not cache.calls
+
+
+def test_index_matches_by_prefix():
+    index = SubscriptionIndex()
+    for n in range(1000):
+        index.add(('services', 'service_%d' % n), n)
+    index.add(('services', '*', 'url'), 'url')
+    index.add((), 'all')
+
+    assert index.match(('services', 'service_7', 'url')) == ['all', 7, 'url']
+    assert sorted(index.match(('services',)), key=str)[:3] == [0, 1, 10]
+    assert len(index) == 1002
+
+    index.remove(('services', '*', 'url'), 'url')
+    assert index.match(('services', 'service_7', 'url')) == ['all', 7]
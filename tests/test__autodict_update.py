@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture
+
+from json_config import main
+from json_config.main import AutoDict, connect
+
+CONFIG = 'config.json'
+
+
+@fixture
+def sample():
+    _sample = AutoDict()
+    _sample['database']['host'] = 'localhost'
+    _sample['database']['port'] = 5432
+    _sample['name'] = 'service'
+    return _sample
+
+
+# noinspection PyProtectedMember
+def assert_linked(node):
+    for key, value in dict.items(node):
+        if isinstance(value, dict):
+            assert isinstance(value, AutoDict)
+            assert value._root is node._root
+            assert value._parent is node
+            assert value._key == key
+            assert_linked(value)
+
+
+def test_update_replaces_nested_dicts(sample):
+    sample.update({'database': {'host': 'replica'}})
+
+    assert sample == {'database': {'host': 'replica'}, 'name': 'service'}
+    assert_linked(sample)
+
+
+def test_deep_update_merges_nested_dicts(sample):
+    database = sample['database']
+
+    sample.deep_update({'database': {'host': 'replica', 'pool': {'size': 10}}, 'cache': {'ttl': 60}})
+
+    assert sample == {
+        'database': {'host': 'replica', 'port': 5432, 'pool': {'size': 10}},
+        'cache': {'ttl': 60},
+        'name': 'service',
+    }
+    assert sample['database'] is database
+    assert_linked(sample)
+
+
+def test_update_sets_a_key_named_deep(sample):
+    sample.update(deep=1)
+
+    assert sample['deep'] == 1
+
+
+def test_deep_update_replaces_leaves_with_dicts(sample):
+    sample.deep_update({'name': {'first': 'service'}})
+
+    assert sample['name'] == {'first': 'service'}
+    assert_linked(sample)
+
+
+def test_update_copies_nodes_attached_elsewhere(sample):
+    other = AutoDict()
+    other.update(sample)
+
+    other['database']['host'] = 'replica'
+
+    assert sample['database']['host'] == 'localhost'
+    assert_linked(other)
+
+
+def test_replace_swaps_the_contents(sample):
+    database = sample['database']
+
+    sample.replace({'cache': {'ttl': 60}}, name='other')
+
+    assert sample == {'cache': {'ttl': 60}, 'name': 'other'}
+    # noinspection PyProtectedMember
+    assert database._path is None
+    assert_linked(sample)
+
+
+def test_update_and_replace_save_once(tmpdir, mocker):
+    """
+    :type tmpdir: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(tmpdir.join(CONFIG).strpath)
+    write_atomic = mocker.patch.object(main, 'write_atomic', wraps=main.write_atomic)
+
+    config.deep_update(dict(('section_%d' % i, {'key': i}) for i in range(10)))
+    config.replace({'only': {'key': 'value'}})
+
+    assert write_atomic.call_count == 2
+    assert json.loads(tmpdir.join(CONFIG).read()) == {'only': {'key': 'value'}}
+
+
+def test_journal_replays_updates_and_replacements(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = connect(tmpdir.join(CONFIG).strpath, journal=True)
+    config['existing']['key'] = 'value'
+
+    config['section'].replace({'a': {'b': 1}})
+    config.deep_update({'existing': {'other': 'value'}, 'section': {'a': {'c': 2}}})
+
+    reloaded = connect(tmpdir.join(CONFIG).strpath, journal=True)
+    assert reloaded == config == {
+        'existing': {'key': 'value', 'other': 'value'},
+        'section': {'a': {'b': 1, 'c': 2}},
+    }
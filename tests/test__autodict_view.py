@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# coding=utf-8
+from pytest import fixture, raises
+
+from json_config.main import AutoDict, ConfigView
+
+
+@fixture
+def sample():
+    _sample = AutoDict()
+    _sample['database']['host'] = 'localhost'
+    _sample['database']['ports'] = [5432]
+    _sample['name'] = 'service'
+    return _sample
+
+
+def test_get_path_reads_nested_values(sample):
+    assert sample.get_path(('database', 'host')) == 'localhost'
+    assert sample.get_path(['database']) is sample['database']
+    assert sample.get_path(()) is sample
+
+
+def test_get_path_does_not_create_missing_nodes(sample):
+    assert sample.get_path(('features', 'beta', 'enabled')) is None
+    assert sample.get_path(('database', 'replica', 'host'), 'fallback') == 'fallback'
+    assert sample.get_path(('name', 'first')) is None
+
+    assert sample == {'database': {'host': 'localhost', 'ports': [5432]}, 'name': 'service'}
+
+
+def test_view_reads_like_the_tree(sample):
+    view = sample.view()
+
+    assert isinstance(view, ConfigView)
+    assert view == sample
+    assert view['database']['host'] == 'localhost'
+    assert isinstance(view['database'], ConfigView)
+    assert sorted(view) == ['database', 'name']
+    assert len(view) == 2
+
+
+def test_view_reads_missing_keys_as_empty(sample):
+    view = sample.view()
+
+    assert not view['features']['beta']['enabled']
+    assert 'features' not in view
+    assert view.get('features') is None
+    assert view.get('name') == 'service'
+
+    assert 'features' not in sample
+
+
+def test_view_is_read_only(sample):
+    view = sample.view()
+
+    with raises(TypeError):
+        view['name'] = 'changed'
+
+    with raises(TypeError):
+        view['features']['beta'] = True
+
+
+def test_view_follows_changes(sample):
+    view = sample.view()
+
+    sample['database']['host'] = 'replica'
+
+    assert view['database']['host'] == 'replica'
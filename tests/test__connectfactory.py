@@ -59,6 +59,77 @@ def test_malformed_serializer_do_not_work(tmpdir):
     del INISerializer
 
 
+def test_connect_reuses_its_classes(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    from json_config.main import connect
+
+    config1 = connect(tmpdir.join('config1.json').strpath)
+    config2 = connect(tmpdir.join('config2.json').strpath)
+    lazy = connect(tmpdir.join('config1.json').strpath, lazy=True)
+
+    assert type(config1) is type(config2)
+    assert type(lazy) is not type(config1)
+    assert type(lazy) is type(connect(tmpdir.join('config2.json').strpath, lazy=True))
+
+
+@skipif(PY26, reason='gc.collect routine not working. # TODO')
+def test_nested_subclasses_are_recognized(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+
+    from json_config.contracts import AbstractSerializer
+    from json_config.main import connect
+
+    class TextSerializer(AbstractSerializer):
+        pass
+
+    class INISerializer(TextSerializer):
+        serializer_ext = 'ini'
+
+    assert isinstance(connect(tmpdir.join('config.ini').strpath), INISerializer)
+    del TextSerializer, INISerializer
+
+
+@skipif(PY26, reason='gc.collect routine not working. # TODO')
+def test_longest_extension_wins(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+
+    from json_config.main import connect, PrettyJSONMixin
+
+    class MinifiedJSON(PrettyJSONMixin):
+        serializer_ext = 'min.json'
+        serializer_indent = None
+
+    class IndentedJSON(PrettyJSONMixin):
+        # inherits its extension, so it's not registered for it
+        serializer_indent = 4
+
+    assert isinstance(connect(tmpdir.join('app.min.json').strpath), MinifiedJSON)
+    assert isinstance(connect(tmpdir.join('app.json').strpath), PrettyJSONMixin)
+    assert not isinstance(connect(tmpdir.join('app.json').strpath), (MinifiedJSON, IndentedJSON))
+    assert isinstance(connect(tmpdir.join('app.json').strpath, file_type='min.json'), MinifiedJSON)
+    del MinifiedJSON, IndentedJSON
+
+
+@skipif(PY26, reason='gc.collect routine not working. # TODO')
+def test_serializers_that_go_away_are_forgotten(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    import gc
+
+    from json_config.contracts import AbstractSerializer, find_serializer
+    from json_config.main import connect
+
+    class INISerializer(AbstractSerializer):
+        serializer_ext = 'ini'
+
+    config = connect(tmpdir.join('config.ini').strpath)
+    assert find_serializer('ini') is INISerializer
+
+    del INISerializer, config
+    gc.collect()
+
+    assert find_serializer('ini') is None
+
+
 def test_custom_serializers_actually_work():
     # TODO
     pass
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# coding=utf-8
+import asyncio
+import json
+
+from pytest import fixture, raises
+
+from json_config import connect_async, storage
+
+
+@fixture
+def loop(request):
+    """:type request: _pytest.python.FixtureRequest"""
+    _loop = asyncio.new_event_loop()
+    request.addfinalizer(_loop.close)
+    return _loop
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    return tmpdir.join('config.json')
+
+
+def test_connect_async_loads_the_file(loop, config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config_file.write('{"test": "success"}')
+
+    async def main():
+        return await connect_async(config_file.strpath)
+
+    config = loop.run_until_complete(main())
+
+    assert config == {'test': 'success'}
+    assert repr(config) == "AsyncConnect({'test': 'success'})"
+
+
+def test_saves_in_the_same_iteration_share_one_write(loop, config_file, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    write_atomic = mocker.patch('json_config.aio.write_atomic', side_effect=storage.write_atomic)
+
+    async def main():
+        config = await connect_async(config_file.strpath)
+
+        config['this']['is']['a']['test'] = 'success'
+        config['another'] = 'test'
+        assert not config_file.exists()
+
+        await config.save()
+        return config
+
+    config = loop.run_until_complete(main())
+
+    assert write_atomic.call_count == 1
+    assert json.loads(config_file.read()) == dict(config)
+
+
+def test_flush_waits_for_the_write(loop, config_file):
+    """:type config_file: py._path.local.LocalPath"""
+
+    async def main():
+        config = await connect_async(config_file.strpath)
+
+        config['first'] = 1
+        await asyncio.sleep(0)
+        config['second'] = 2
+
+        await config.flush()
+        assert json.loads(config_file.read()) == {'first': 1, 'second': 2}
+
+        # nothing pending
+        await config.flush()
+
+    loop.run_until_complete(main())
+
+
+def test_batch_writes_once(loop, config_file, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    write_atomic = mocker.patch('json_config.aio.write_atomic')
+
+    async def main():
+        config = await connect_async(config_file.strpath)
+
+        with config.batch():
+            for i in range(10):
+                config['key_%s' % i] = i
+                await asyncio.sleep(0)
+
+        await config.flush()
+
+    loop.run_until_complete(main())
+    assert write_atomic.call_count == 1
+
+
+def test_failed_writes_raise_and_stay_pending(loop, config_file, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    write_atomic = mocker.patch('json_config.aio.write_atomic', side_effect=IOError('disk full'))
+
+    async def main():
+        config = await connect_async(config_file.strpath)
+
+        config['test'] = 'success'
+        with raises(IOError):
+            await config.flush()
+        assert config._dirty_
+
+        write_atomic.side_effect = None
+        await config.flush()
+        assert not config._dirty_
+
+    loop.run_until_complete(main())
+    assert write_atomic.call_count == 2
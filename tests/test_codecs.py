@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture, mark, raises
+
+from json_config import codecs
+from json_config.codecs import AUTO, available_codecs, get_codec
+from json_config.main import connect
+
+parametrize = mark.parametrize
+
+CONFIG = 'config.json'
+
+DATA = {
+    'database': {'host': 'localhost', 'port': 5432, 'replicas': [{'host': 'a', 'weight': 0.5}]},
+    'flags': {'beta': True, 'legacy': False, 'owner': None},
+    'name': u'caf\xe9 ☃',
+    'empty': {},
+    'list': [],
+    'path': '/var/www',
+}
+
+FORMATS = [
+    {'indent': 2, 'sort_keys': True, 'separators': (',', ': ')},
+    {'indent': 2, 'sort_keys': False, 'separators': (',', ': '), 'ensure_ascii': False},
+    {'indent': 4, 'sort_keys': True, 'separators': (',', ': ')},
+    {'indent': '\t', 'sort_keys': True},
+    {'indent': None, 'separators': (',', ':')},
+    {'indent': None, 'sort_keys': True},
+]
+
+
+@fixture(params=available_codecs())
+def codec(request):
+    return get_codec(request.param)
+
+
+@parametrize('options', FORMATS)
+def test_dumps_like_json(codec, options):
+    assert codec.dumps(DATA, **options) == json.dumps(DATA, **options)
+
+
+def test_loads_like_json(codec):
+    text = json.dumps(DATA)
+
+    assert codec.loads(text) == json.loads(text)
+
+
+@parametrize('obj', [
+    {'big': 1 << 70},
+    {1: 'non-string key'},
+    {'nested': {'big': -(1 << 70)}},
+    {'nan': float('nan'), 'inf': [float('inf'), -float('inf')]},
+    {'floats': [1e16, 1e-05, -2.5e-07, 1.5e300]},
+])
+def test_dumps_falls_back_to_json(codec, obj):
+    assert codec.dumps(obj, indent=2) == json.dumps(obj, indent=2)
+
+
+@parametrize('text', ['{"big": 123456789012345678901234567890}', '{"nan": NaN}', '{"inf": -Infinity}'])
+def test_loads_falls_back_to_json(codec, text):
+    assert repr(codec.loads(text)) == repr(json.loads(text))
+
+
+@parametrize('name', available_codecs())
+def test_configs_keep_non_finite_floats(tmpdir, name):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = connect(tmpdir.join(CONFIG).strpath, codec=name)
+    config.update({'nan': float('nan'), 'inf': float('inf'), 'floats': {'big': 1e16, 'small': 1e-05}})
+
+    loaded = connect(tmpdir.join(CONFIG).strpath, codec=name)
+    assert loaded['nan'] != loaded['nan']
+    assert loaded['inf'] == float('inf')
+    assert loaded['floats'] == {'big': 1e16, 'small': 1e-05}
+    assert tmpdir.join(CONFIG).read() == json.dumps(dict(config), indent=2, sort_keys=True, separators=(',', ': '))
+
+
+def test_loads_rejects_invalid_json(codec):
+    with raises(ValueError):
+        codec.loads('{"a": }')
+
+
+def test_auto_is_the_fastest_installed():
+    assert get_codec(AUTO) is get_codec(available_codecs()[0])
+    assert available_codecs()[-1] == 'json'
+
+
+def test_get_codec_refuses_unknown_codecs():
+    with raises(ValueError):
+        get_codec('yaml')
+
+
+def test_get_codec_refuses_missing_packages(mocker):
+    """:type mocker: pytest_mock.MockFixture"""
+    mocker.patch.object(codecs.UjsonCodec, 'module', None)
+    mocker.patch.dict(codecs._codecs, clear=True)
+
+    with raises(RuntimeError):
+        get_codec('ujson')
+    assert 'ujson' not in available_codecs()
+
+
+@parametrize('name', available_codecs())
+def test_configs_save_the_same_file_with_every_codec(tmpdir, name):
+    """:type tmpdir: py._path.local.LocalPath"""
+    expected = connect(tmpdir.join('expected.json').strpath, codec='json')
+    expected.update(DATA)
+
+    config = connect(tmpdir.join(CONFIG).strpath, codec=name)
+    config.update(DATA)
+    config['database']['port'] = 5433
+    expected['database']['port'] = 5433
+
+    assert config.codec is get_codec(name)
+    assert tmpdir.join(CONFIG).read() == tmpdir.join('expected.json').read()
+    assert connect(tmpdir.join(CONFIG).strpath, codec=name) == expected
+
+
+def test_compact_configs(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = connect(tmpdir.join(CONFIG).strpath)
+    config.serializer_indent = None
+    config.serializer_separators = (',', ':')
+
+    config['database']['host'] = 'localhost'
+
+    assert tmpdir.join(CONFIG).read() == '{"database":{"host":"localhost"}}'
+
+
+def test_connect_refuses_unknown_codecs(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    with raises(ValueError):
+        connect(tmpdir.join(CONFIG).strpath, codec='yaml')
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# coding=utf-8
+import gc
+import json
+import os
+import threading
+import weakref
+
+from pytest import fixture, raises
+
+from json_config.main import connect
+
+CONFIG = 'config.json'
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write('{"database": {"host": "localhost"}}')
+    return _config_file
+
+
+def test_shared_connections_get_the_same_config(config_file, monkeypatch):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, shared=True)
+
+    monkeypatch.chdir(config_file.dirname)
+    assert connect(CONFIG, shared=True) is config
+    assert connect(os.path.join('.', '..', config_file.dirpath().basename, CONFIG), shared=True) is config
+
+
+def test_shared_configs_see_each_others_changes(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, shared=True)
+    database = connect(config_file.strpath, shared=True)['database']
+
+    config['database']['port'] = 5432
+    database['host'] = 'replica'
+
+    assert json.loads(config_file.read()) == {'database': {'host': 'replica', 'port': 5432}}
+
+
+def test_unshared_connections_are_separate(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, shared=True)
+
+    assert connect(config_file.strpath) is not config
+    assert connect(config_file.strpath) is not connect(config_file.strpath)
+
+
+def test_refuses_other_options(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, shared=True, save_delay=1)
+
+    assert connect(config_file.strpath, shared=True, save_delay=1) is config
+    with raises(ValueError):
+        connect(config_file.strpath, shared=True)
+    with raises(ValueError):
+        connect(config_file.strpath, shared=True, save_delay=1, lazy=True)
+
+
+def test_unused_configs_are_freed(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, shared=True)
+    config['database']['port'] = 5432
+    ref = weakref.ref(config)
+
+    del config
+    gc.collect()
+
+    assert ref() is None
+    assert connect(config_file.strpath, shared=True)['database']['port'] == 5432
+
+
+def test_threads_connect_once(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    configs = []
+
+    def target():
+        configs.append(connect(config_file.strpath, shared=True))
+
+    threads = [threading.Thread(target=target) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(configs) == 8
+    assert all(config is configs[0] for config in configs)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+import threading
+
+from pytest import raises
+
+from json_config.locks import ReadWriteLock
+from json_config.main import AutoDict, connect
+
+
+def run_in_thread(target):
+    """Start `target` on a thread, returning an event set once it finishes."""
+    done = threading.Event()
+
+    def run():
+        target()
+        done.set()
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return done
+
+
+def test_readers_share_the_lock():
+    lock = ReadWriteLock()
+
+    with lock.shared():
+        assert run_in_thread(lambda: lock.shared().__enter__()).wait(1)
+
+
+def test_writer_excludes_readers_and_writers():
+    lock = ReadWriteLock()
+
+    with lock:
+        reader = run_in_thread(lambda: lock.shared().__enter__())
+        assert not reader.wait(0.05)
+
+    assert reader.wait(1)
+
+    with lock.shared():
+        writer = run_in_thread(lock.acquire)
+        assert not writer.wait(0.05)
+
+    assert writer.wait(1)
+
+
+def test_writer_may_reenter_and_read():
+    lock = ReadWriteLock()
+
+    with lock:
+        with lock:
+            with lock.shared():
+                pass
+
+    assert run_in_thread(lock.acquire).wait(1)
+
+
+def test_readers_can_not_upgrade():
+    lock = ReadWriteLock()
+
+    with lock.shared():
+        assert lock.is_reading()
+        with raises(RuntimeError):
+            lock.acquire()
+
+    with lock:
+        with lock.shared():
+            assert not lock.is_reading()
+
+
+def test_lock_makes_other_threads_wait(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config_file = tmpdir.join('config.json')
+    config = connect(config_file.strpath)
+
+    with config.lock() as is_owner:
+        assert is_owner
+        other = run_in_thread(lambda: config.__setitem__('other', 'thread'))
+        config['this'] = 'thread'
+
+        assert not other.wait(0.05)
+
+    # the other thread's change wasn't swallowed by our lock, it saved on its own
+    assert other.wait(1)
+    assert json.loads(config_file.read()) == {'this': 'thread', 'other': 'thread'}
+
+
+def test_concurrent_writers_keep_every_change(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config_file = tmpdir.join('config.json')
+    config = connect(config_file.strpath, rwlock=True)
+
+    def work(n):
+        for i in range(50):
+            config['thread_%s' % n]['key_%s' % i] = i
+            config.update({'shared_%s' % n: i})
+            config.serialize()
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = json.loads(config_file.read())
+    assert result == json.loads(config.serialize())
+    assert all(len(result['thread_%s' % n]) == 50 for n in range(8))
+
+
+def test_rwlock_can_be_set_on_the_class():
+    class SharedAutoDict(AutoDict):
+        rwlock = True
+
+    sample = SharedAutoDict()
+    sample['this']['is']['a']['test'] = 'success'
+
+    assert isinstance(sample['this']._mutex, ReadWriteLock)
+    assert repr(sample) == "SharedAutoDict({'this': {'is': {'a': {'test': 'success'}}}})"
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+import threading
+
+from pytest import fixture
+
+from json_config.main import AutoConfigBase, _flush_dirty_roots
+
+CONFIG = 'config.json'
+
+
+class AutoJSON(AutoConfigBase):
+    def serialize(self):
+        return json.dumps(dict(self), sort_keys=True)
+
+    def deserialize(self, string):
+        return json.loads(string)
+
+
+@fixture
+def auto_save(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+
+    return AutoJSON(config_file=tmpdir.join(CONFIG).strpath)
+
+
+# noinspection PyUnresolvedReferences
+def test_batch_writes_once_on_exit(auto_save, mocker, tmpdir):
+    """
+    :type mocker: pytest_mock.MockFixture
+    :type tmpdir: py._path.local.LocalPath
+    """
+    mocker.spy(auto_save, u'_write')
+
+    with auto_save.batch():
+        for i in range(100):
+            auto_save['key_%s' % i]['value'] = i
+        del auto_save['key_0']
+
+        assert auto_save._write.call_count == 0
+        assert not tmpdir.join(CONFIG).exists()
+
+    assert auto_save._write.call_count == 1
+
+    with tmpdir.join(CONFIG).open() as f:
+        result = json.load(f)
+
+    assert len(result) == 99
+    assert result['key_99'] == {'value': 99}
+
+
+# noinspection PyUnresolvedReferences
+def test_nested_batches_write_once_when_outermost_exits(auto_save, mocker):
+    """:type mocker: pytest_mock.MockFixture"""
+    mocker.spy(auto_save, u'_write')
+
+    with auto_save.batch():
+        auto_save['this']['is'] = 'outer'
+
+        with auto_save['this'].batch():
+            auto_save['this']['is'] = 'inner'
+
+        assert auto_save._write.call_count == 0
+
+    assert auto_save._write.call_count == 1
+
+
+# noinspection PyUnresolvedReferences
+def test_batch_without_changes_does_not_write(auto_save, mocker, tmpdir):
+    """
+    :type mocker: pytest_mock.MockFixture
+    :type tmpdir: py._path.local.LocalPath
+    """
+    mocker.spy(auto_save, u'_write')
+
+    with auto_save.batch():
+        pass
+
+    assert auto_save._write.call_count == 0
+    assert not tmpdir.join(CONFIG).exists()
+
+
+# noinspection PyUnresolvedReferences
+def test_save_delay_coalesces_saves_into_one_delayed_write(tmpdir, mocker):
+    """
+    :type mocker: pytest_mock.MockFixture
+    :type tmpdir: py._path.local.LocalPath
+    """
+    mocker.patch('json_config.main.monotonic', return_value=100.0)
+    Timer = mocker.patch('json_config.main.Timer')
+
+    auto_save = AutoJSON(config_file=tmpdir.join(CONFIG).strpath, save_delay=0.05)
+    mocker.spy(auto_save, u'_write')
+
+    auto_save['first'] = 1
+    assert auto_save._write.call_count == 1
+
+    for i in range(10):
+        auto_save['later'] = i
+    assert auto_save._write.call_count == 1
+
+    # one timer, for the rest of the window
+    assert Timer.call_count == 1
+    delay, callback = Timer.call_args[0]
+    assert abs(delay - 0.05) < 1e-9
+
+    callback()
+    assert auto_save._write.call_count == 2
+
+    with tmpdir.join(CONFIG).open() as f:
+        assert json.load(f) == {'first': 1, 'later': 9}
+
+
+def test_delayed_flush_waits_for_changes_in_progress(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    auto_save = AutoJSON(config_file=tmpdir.join(CONFIG).strpath, save_delay=60)
+    auto_save['first'] = 1
+    auto_save['second'] = 2
+
+    flushed = threading.Event()
+    with auto_save._mutex:
+        thread = threading.Thread(target=lambda: (auto_save.flush(), flushed.set()))
+        thread.start()
+
+        assert not flushed.wait(0.05)
+        auto_save['third'] = 3
+
+    assert flushed.wait(1)
+    with tmpdir.join(CONFIG).open() as f:
+        assert json.load(f) == {'first': 1, 'second': 2, 'third': 3}
+
+
+# noinspection PyUnresolvedReferences
+def test_flush_writes_deferred_changes_immediately(tmpdir, mocker):
+    """
+    :type mocker: pytest_mock.MockFixture
+    :type tmpdir: py._path.local.LocalPath
+    """
+    auto_save = AutoJSON(config_file=tmpdir.join(CONFIG).strpath, save_delay=60)
+    mocker.spy(auto_save, u'_write')
+
+    auto_save['first'] = 1
+    auto_save['second'] = 2
+    assert auto_save._write.call_count == 1
+
+    auto_save.flush()
+    assert auto_save._write.call_count == 2
+
+    auto_save.flush()
+    assert auto_save._write.call_count == 2
+
+
+def test_pending_changes_are_flushed_at_exit(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    auto_save = AutoJSON(config_file=tmpdir.join(CONFIG).strpath, save_delay=60)
+
+    auto_save['first'] = 1
+    auto_save['second'] = 2
+
+    _flush_dirty_roots()
+
+    with tmpdir.join(CONFIG).open() as f:
+        assert json.load(f) == {'first': 1, 'second': 2}
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture
+
+from json_config.main import connect
+from json_config.storage import apply_changes, read_journal
+
+CONFIG = 'config.json'
+JOURNAL = 'config.json.journal'
+
+
+@fixture
+def journaled(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    tmpdir.join(CONFIG).write('{"existing": {"key": "value"}}')
+
+    return connect(tmpdir.join(CONFIG).strpath, journal=True)
+
+
+def read_records(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    return read_journal(tmpdir.join(JOURNAL).strpath)[0]
+
+
+def test_changes_are_appended_instead_of_rewriting_the_file(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled['this']['is']['a']['test'] = 'success'
+    del journaled['existing']['key']
+
+    assert tmpdir.join(CONFIG).read() == '{"existing": {"key": "value"}}'
+    assert read_records(tmpdir) == [
+        ['set', ['this', 'is', 'a', 'test'], 'success'],
+        ['del', ['existing', 'key']],
+        ['del', ['existing']],
+    ]
+
+
+def test_loading_replays_the_journal_over_the_snapshot(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled['this']['is']['a']['test'] = 'success'
+    journaled.update({'updated': {'nested': [1, 2]}})
+    del journaled['existing']
+
+    reloaded = connect(tmpdir.join(CONFIG).strpath, journal=True)
+
+    assert reloaded == {'this': {'is': {'a': {'test': 'success'}}}, 'updated': {'nested': [1, 2]}}
+
+
+def test_loading_does_not_journal_anything(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled['test'] = 'success'
+
+    reloaded = connect(tmpdir.join(CONFIG).strpath, journal=True)
+    reloaded['another'] = 'test'
+
+    assert read_records(tmpdir) == [['set', ['test'], 'success'], ['set', ['another'], 'test']]
+
+
+def test_journal_is_compacted_past_the_record_threshold(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled.journal_max_records = 3
+
+    journaled['first'] = 1
+    journaled['second'] = 2
+    assert len(read_records(tmpdir)) == 2
+
+    journaled['third'] = 3
+    assert not tmpdir.join(JOURNAL).exists()
+    assert json.loads(tmpdir.join(CONFIG).read()) == {'existing': {'key': 'value'}, 'first': 1, 'second': 2,
+                                                      'third': 3}
+
+
+def test_journal_is_compacted_past_the_size_threshold(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled.journal_max_bytes = 100
+
+    journaled['small'] = 'value'
+    assert tmpdir.join(JOURNAL).exists()
+
+    journaled['large'] = 'x' * 100
+    assert not tmpdir.join(JOURNAL).exists()
+    assert json.loads(tmpdir.join(CONFIG).read())['large'] == 'x' * 100
+
+
+def test_compact_writes_a_snapshot(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled['test'] = 'success'
+
+    journaled.compact()
+
+    assert not tmpdir.join(JOURNAL).exists()
+    assert json.loads(tmpdir.join(CONFIG).read()) == {'existing': {'key': 'value'}, 'test': 'success'}
+
+
+def test_missing_snapshot_is_written_in_full(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled = connect(tmpdir.join(CONFIG).strpath, journal=True)
+
+    journaled['test'] = 'success'
+
+    assert not tmpdir.join(JOURNAL).exists()
+    assert json.loads(tmpdir.join(CONFIG).read()) == {'test': 'success'}
+
+
+def test_torn_records_are_ignored(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled['test'] = 'success'
+    tmpdir.join(JOURNAL).write('["set", ["torn"', mode='a')
+
+    reloaded = connect(tmpdir.join(CONFIG).strpath, journal=True)
+
+    assert reloaded == {'existing': {'key': 'value'}, 'test': 'success'}
+
+
+def test_apply_changes():
+    obj = {'a': {'b': 1}, 'c': 2}
+
+    apply_changes(obj, [
+        ['set', ['a', 'd', 'e'], 3],
+        ['set', ['c', 'f'], 4],
+        ['del', ['a', 'b']],
+        ['del', ['missing', 'path']],
+    ])
+    assert obj == {'a': {'d': {'e': 3}}, 'c': {'f': 4}}
+
+    apply_changes(obj, [['set', [], {'replaced': True}]])
+    assert obj == {'replaced': True}
+
+
+def test_replacing_a_branch_with_an_empty_dict_is_journaled(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    journaled['a']['x'] = 1
+    journaled['b'] = 2
+    journaled['a'] = {}
+    journaled['c'] = 3
+
+    reloaded = connect(tmpdir.join(CONFIG).strpath, journal=True)
+
+    assert reloaded == journaled
+    assert reloaded['a'] == {}
+
+
+def test_reading_missing_keys_is_not_journaled(journaled, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    # noinspection PyStatementEffect
+    journaled['this']['is']['a']['test']
+    journaled['test'] = 'success'
+
+    assert read_records(tmpdir) == [['set', ['test'], 'success']]
+
+
+def test_crash_before_removing_the_journal_loses_nothing(journaled, tmpdir, mocker):
+    """
+    :type tmpdir: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    journaled['a'] = 1
+    with journaled.batch():
+        del journaled['a']
+        journaled['b'] = 2
+
+        # the journal survives the compaction, as if we crashed right after the snapshot's rename
+        mocker.patch('json_config.main.remove_journal')
+        journaled.compact()
+
+    reloaded = connect(tmpdir.join(CONFIG).strpath, journal=True)
+
+    assert reloaded == {'existing': {'key': 'value'}, 'b': 2}
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+import multiprocessing
+import os
+import threading
+
+from pytest import fixture, mark, raises
+
+from json_config.main import connect
+
+skipif = mark.skipif
+
+CONFIG = 'config.json'
+
+pytestmark = skipif(os.name != 'posix', reason='requires fcntl')
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write('{"existing": "value"}')
+    return _config_file
+
+
+def test_saves_merge_changes_made_by_others(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    first = connect(config_file.strpath, multiprocess=True)
+    second = connect(config_file.strpath, multiprocess=True)
+
+    first['first']['key'] = 1
+    second['second']['key'] = 2
+    del second['existing']
+
+    expected = {'first': {'key': 1}, 'second': {'key': 2}}
+    assert json.loads(config_file.read()) == expected
+    assert second == expected
+
+    first['first']['another'] = 3
+    assert json.loads(config_file.read()) == {'first': {'key': 1, 'another': 3}, 'second': {'key': 2}}
+
+
+def test_local_changes_win_over_stale_disk_values(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    first = connect(config_file.strpath, multiprocess=True)
+    second = connect(config_file.strpath, multiprocess=True)
+
+    first['existing'] = 'first'
+    second['existing'] = 'second'
+
+    assert json.loads(config_file.read()) == {'existing': 'second'}
+
+
+def test_unchanged_file_is_not_reread(config_file, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(config_file.strpath, multiprocess=True)
+    read_file = mocker.spy(config, '_read_file')
+
+    config['first'] = 1
+    config['second'] = 2
+
+    assert read_file.call_count == 0
+
+
+def test_nested_assignment_after_a_concurrent_write(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    first = connect(config_file.strpath, multiprocess=True)
+    second = connect(config_file.strpath, multiprocess=True)
+
+    def write():
+        first['a'] = {'y': 1}
+        second['z'] = 1
+        first['a']['x'] = 2
+
+    # merging used to take the file lock a second time, and hang
+    writer = threading.Thread(target=write)
+    writer.daemon = True
+    writer.start()
+    writer.join(10)
+
+    assert not writer.is_alive()
+    assert json.loads(config_file.read()) == {'existing': 'value', 'a': {'x': 2, 'y': 1}, 'z': 1}
+
+
+def add_keys(path, n):
+    config = connect(path, multiprocess=True)
+    for i in range(20):
+        config['worker_%s' % n]['key_%s' % i] = i
+
+
+def test_concurrent_processes_lose_no_updates(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    workers = [multiprocessing.Process(target=add_keys, args=(config_file.strpath, n)) for n in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    result = json.loads(config_file.read())
+    assert all(result['worker_%s' % n] == dict(('key_%s' % i, i) for i in range(20)) for n in range(4))
+
+
+def test_multiprocess_excludes_journal_and_background(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    with raises(ValueError):
+        connect(config_file.strpath, multiprocess=True, journal=True)
+
+    with raises(ValueError):
+        connect(config_file.strpath, multiprocess=True, background=True)
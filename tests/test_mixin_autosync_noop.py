@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture, raises
+
+from json_config import main
+from json_config.main import connect
+
+CONFIG = 'config.json'
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write('{"existing": "value"}')
+    return _config_file
+
+
+@fixture
+def write_atomic(mocker):
+    """:type mocker: pytest_mock.MockFixture"""
+    return mocker.patch.object(main, 'write_atomic', wraps=main.write_atomic)
+
+
+def test_assigning_the_same_value_does_not_write(config_file, write_atomic):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    config['database']['port'] = 5432
+    config['database']['hosts'] = ['a', 'b']
+    assert write_atomic.call_count == 2
+
+    config['database']['port'] = 5432
+    config['database']['hosts'] = ['a', 'b']
+    config.update({'existing': 'value', 'database': {'port': 5432, 'hosts': ['a', 'b']}})
+    assert write_atomic.call_count == 2
+
+
+def test_equal_values_of_another_type_are_written(config_file, write_atomic):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    config['key'] = 1
+
+    config['key'] = True
+    config['key'] = 1.0
+
+    assert write_atomic.call_count == 3
+    assert json.loads(config_file.read())['key'] == 1.0
+
+
+def test_lists_changed_in_place_are_written(config_file, write_atomic):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    config['list'] = [1]
+
+    config['list'].append(2)
+    config['list'] = config['list']
+
+    assert write_atomic.call_count == 2
+    assert json.loads(config_file.read())['list'] == [1, 2]
+
+
+def test_unchanged_tree_is_not_serialized(config_file, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(config_file.strpath)
+    config['key'] = 'value'
+    serialize = mocker.spy(config, 'serialize')
+
+    config['key'] = 'value'
+    config.save()
+
+    assert serialize.call_count == 0
+
+
+def test_same_document_is_not_written(config_file, write_atomic):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    config['key'] = 'value'
+
+    with config.batch():
+        config['key'] = 'other'
+        del config['key']
+        config['key'] = 'value'
+
+    assert write_atomic.call_count == 1
+
+
+def test_files_changed_by_others_are_rewritten(config_file, write_atomic):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    config['key'] = 'value'
+
+    config_file.write('{}')
+    config.save()
+
+    assert write_atomic.call_count == 2
+    assert json.loads(config_file.read()) == {'existing': 'value', 'key': 'value'}
+
+
+def test_failed_writes_are_retried(config_file, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(config_file.strpath)
+    mocker.patch.object(main, 'write_atomic', side_effect=IOError)
+
+    with raises(IOError):
+        config['key'] = 'value'
+
+    mocker.stopall()
+    config.save()
+
+    assert json.loads(config_file.read()) == {'existing': 'value', 'key': 'value'}
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture, mark
+
+from json_config.main import connect
+
+parametrize = mark.parametrize
+
+CONFIG = 'config.json'
+
+DATA = {
+    'database': {'host': 'localhost', 'port': 5432, 'options': {'ssl': True}},
+    'cache': {'ttl': 60, 'hosts': ['a', 'b']},
+    'name': 'app',
+}
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write(json.dumps(DATA))
+    return _config_file
+
+
+def edit(config_file, **changes):
+    """:type config_file: py._path.local.LocalPath"""
+    obj = json.loads(config_file.read())
+    obj.update(changes)
+    config_file.write(json.dumps(obj))
+
+
+@parametrize('lazy', [False, True])
+def test_held_sections_see_new_values(config_file, lazy):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, lazy=lazy)
+    database = config['database']
+    options = database['options']
+
+    edit(config_file, database={'host': 'replica', 'port': 5432, 'options': {'ssl': False}})
+    config.reload()
+
+    assert config['database'] is database
+    assert database['options'] is options
+    assert database == {'host': 'replica', 'port': 5432, 'options': {'ssl': False}}
+
+
+def test_unchanged_members_keep_their_identity(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    cache, hosts = config['cache'], config['cache']['hosts']
+
+    edit(config_file, name='other')
+    config.reload()
+
+    assert config['cache'] is cache
+    assert cache['hosts'] is hosts
+
+
+def test_only_the_changed_spine_is_reencoded(config_file, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(config_file.strpath)
+    config.serialize()
+    dumps = mocker.spy(config.codec, 'dumps')
+    config.serialize()
+    unchanged = dumps.call_count
+
+    edit(config_file, database=dict(DATA['database'], options={'ssl': False}))
+    config.reload()
+
+    assert json.loads(config.serialize()) == json.loads(config_file.read())
+    # database and options, on top of what's re-encoded anyway (the root, and branches holding lists)
+    assert dumps.call_count == 2 * unchanged + 2
+
+
+@parametrize('changes', [
+    {'database': 'sqlite:///app.db'},
+    {'name': {'first': 'app'}},
+    {'cache': {'ttl': 60}},
+    {'cache': {'ttl': 60.0, 'hosts': ['a', 'b']}},
+    {'extra': {'a': {'b': []}}},
+])
+@parametrize('lazy', [False, True])
+def test_matches_a_fresh_load(config_file, changes, lazy):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, lazy=lazy)
+    config['database']['options']
+
+    edit(config_file, **changes)
+    config.reload()
+
+    assert config.serialize() == connect(config_file.strpath).serialize()
+
+
+def test_deleted_members_are_removed(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    database = config['database']
+    config_file.write(json.dumps({'name': 'app'}))
+
+    config.reload()
+
+    assert config == {'name': 'app'}
+    assert database._path is None
+
+
+def test_sections_made_by_reads_are_kept(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    features = config['features']
+
+    config.reload()
+    assert config['features'] is features
+
+    edit(config_file, features={})
+    config.reload()
+    config['name'] = 'saved'
+
+    assert json.loads(config_file.read())['features'] == {}
+
+
+def test_reloading_does_not_save(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    config_file.write(json.dumps({'name': 'edited'}, indent=4))
+
+    config.reload()
+
+    assert config_file.read() == json.dumps({'name': 'edited'}, indent=4)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture, mark, raises
+
+from json_config import main
+from json_config.main import RevalidateMixin, connect
+
+parametrize = mark.parametrize
+
+CONFIG = 'config.json'
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write('{"database": {"host": "localhost"}}')
+    return _config_file
+
+
+@fixture
+def clock(mocker):
+    """
+    Seconds on the clock configs check their TTL by.  Set ``clock[0]`` to move it.
+
+    :type mocker: pytest_mock.MockFixture
+    """
+    _clock = [1000.0]
+    mocker.patch.object(main, 'monotonic', lambda: _clock[0])
+    return _clock
+
+
+def edit(config_file, obj):
+    """:type config_file: py._path.local.LocalPath"""
+    config_file.new(basename='.swp').write(json.dumps(obj))
+    config_file.new(basename='.swp').rename(config_file)
+
+
+@parametrize('lazy', [False, True])
+def test_reloads_once_the_ttl_passed(config_file, clock, lazy):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, revalidate=5, lazy=lazy)
+    edit(config_file, {'database': {'host': 'replica'}})
+
+    clock[0] += 4
+    assert config['database']['host'] == 'localhost'
+    assert config.revalidations == 0
+
+    clock[0] += 1
+    assert config['database']['host'] == 'replica'
+    assert (config.revalidations, config.reloads) == (1, 1)
+
+
+def test_checks_at_most_once_per_ttl(config_file, clock, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(config_file.strpath, revalidate=5)
+    file_signature = mocker.patch.object(main, 'file_signature', wraps=main.file_signature)
+
+    for _ in range(20):
+        clock[0] += 1
+        assert config.get_path('database.host') == 'localhost'
+        assert 'database' in config
+        assert list(config.items())
+
+    assert config.revalidations == file_signature.call_count == 4
+    assert config.reloads == 0
+
+
+def test_unchanged_files_are_not_parsed(config_file, clock, mocker):
+    """
+    :type config_file: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = connect(config_file.strpath, revalidate=1)
+    deserialize = mocker.spy(config, 'deserialize')
+    config['database']['port'] = 5432
+
+    clock[0] += 1
+    assert config['database']['port'] == 5432
+    assert config.revalidations == 1
+    assert not deserialize.called
+
+
+def test_keeps_serving_when_the_file_is_invalid(config_file, clock):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, revalidate=1)
+    config_file.write('{"database": ')
+
+    clock[0] += 1
+    assert config['database']['host'] == 'localhost'
+
+    edit(config_file, {'database': {'host': 'replica'}})
+    clock[0] += 1
+    assert config['database']['host'] == 'replica'
+    assert (config.revalidations, config.reloads) == (2, 1)
+
+
+def test_revalidate(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+
+    assert not config.revalidate()
+    edit(config_file, {'database': {'host': 'replica'}})
+    assert config['database'].revalidate()
+    assert config == {'database': {'host': 'replica'}}
+
+
+def test_only_revalidating_configs_pay_for_it(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    assert not isinstance(connect(config_file.strpath), RevalidateMixin)
+    assert isinstance(connect(config_file.strpath, revalidate=1), RevalidateMixin)
+
+    with raises(ValueError):
+        main.AutoConfigBase(config_file.strpath, revalidate=1)
+
+
+def test_unsaved_changes_survive_a_reload(config_file, clock):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, revalidate=1)
+
+    with config.batch():
+        config['database']['port'] = 5432
+        edit(config_file, {'database': {'host': 'replica'}, 'cache': {'ttl': 60}})
+        clock[0] += 1
+        assert config['database'] == {'host': 'replica', 'port': 5432}
+
+    assert json.loads(config_file.read()) == {'database': {'host': 'replica', 'port': 5432}, 'cache': {'ttl': 60}}
+
+
+def test_readers_sharing_the_lock_defer_the_check(config_file, clock):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, revalidate=1, rwlock=True)
+    edit(config_file, {'database': {'host': 'replica'}})
+    clock[0] += 1
+
+    with config.read_lock():
+        assert 'database' in config
+        assert config.get('database') == {'host': 'localhost'}
+        assert repr(config)
+
+    assert config['database']['host'] == 'replica'
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# coding=utf-8
+import io
+import json
+
+from pytest import fixture, mark, raises
+
+from json_config import main, sections
+from json_config.main import connect
+
+parametrize = mark.parametrize
+
+CONFIG = 'config.json'
+
+DATA = {
+    'database': {'host': 'localhost', 'port': 5432},
+    'cache': {'ttl': 60, 'hosts': ['a', 'b']},
+    'name': u'caf\xe9',
+    'services': {'billing': {'url': 'http://billing'}, 'search': {'url': u'http://s\xf6k'}},
+}
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    connect(_config_file.strpath, section_index=True).update(DATA)
+    return _config_file
+
+
+@fixture
+def scan_index(mocker):
+    """:type mocker: pytest_mock.MockFixture"""
+    return mocker.patch.object(main, 'scan_index', wraps=main.scan_index)
+
+
+@parametrize('indent', [2, '\t'])
+@parametrize('ensure_ascii', [True, False])
+def test_index_text_matches_a_scan(indent, ensure_ascii):
+    text = json.dumps(DATA, indent=indent, sort_keys=True, separators=(',', ': '), ensure_ascii=ensure_ascii)
+    data = text.encode('utf-8')
+
+    spans, size = sections.index_text(text, indent)
+
+    assert size == len(data)
+    assert spans == sections.scan_index(io.BytesIO(data))
+    for key, (start, end) in spans.items():
+        assert json.loads(data[start:end].decode('utf-8')) == DATA[key]
+
+
+def test_index_text_needs_indentation():
+    assert sections.index_text(json.dumps(DATA), None) is None
+
+
+def test_loads_only_the_sections_asked_for(config_file, scan_index):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, sections=['database', 'services', 'missing'])
+
+    assert config == {'database': DATA['database'], 'services': DATA['services']}
+    assert not scan_index.called
+
+
+def test_unloaded_sections_survive_saves(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, sections=['database'])
+    config['database']['host'] = 'replica'
+
+    assert json.loads(config_file.read()) == dict(DATA, database={'host': 'replica', 'port': 5432})
+    assert connect(config_file.strpath).serialize() == config_file.read()
+
+
+def test_unloaded_sections_are_read_at_save(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, sections=['database'])
+    connect(config_file.strpath, sections=['cache'])['cache']['ttl'] = 0
+
+    config['database']['host'] = 'replica'
+
+    assert json.loads(config_file.read())['cache']['ttl'] == 0
+
+
+def test_keys_set_or_deleted_become_ours(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, sections=['database'])
+    config['name'] = 'other'
+    del config['database']
+
+    written = json.loads(config_file.read())
+    assert written['name'] == 'other'
+    assert 'database' not in written
+
+    del config['name']
+    assert 'name' not in json.loads(config_file.read())
+
+
+def test_reading_unloaded_sections_does_not_replace_them(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, sections=['database'])
+
+    assert config.get_path('cache.ttl') is None
+    assert config['cache']['ttl'] == 60
+    config['database']['port'] = 5433
+
+    assert json.loads(config_file.read())['cache'] == DATA['cache']
+
+
+@parametrize('write', [
+    lambda config: config['services']['extra'].__setitem__('url', 'http://extra'),
+    lambda config: config.set_path('services.extra.url', 'http://extra'),
+    lambda config: config.deep_update({'services': {'extra': {'url': 'http://extra'}}}),
+])
+@parametrize('lazy', [False, True])
+def test_writes_below_unloaded_sections_keep_their_other_keys(config_file, write, lazy):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, sections=['database'], lazy=lazy)
+
+    write(config)
+
+    services = dict(DATA['services'], extra={'url': 'http://extra'})
+    assert json.loads(config_file.read()) == dict(DATA, services=services)
+    assert config['services'] == services
+
+
+def test_rebuilds_a_stale_index(config_file, scan_index):
+    """:type config_file: py._path.local.LocalPath"""
+    config_file.write(json.dumps(dict(DATA, database={'host': 'edited'})))
+
+    assert connect(config_file.strpath, sections=['database']) == {'database': {'host': 'edited'}}
+    assert connect(config_file.strpath, sections=['cache']) == {'cache': DATA['cache']}
+    assert scan_index.call_count == 1
+
+
+def test_ignores_a_corrupt_index(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config_file.new(ext='json.index').write('{"signature": ')
+
+    assert connect(config_file.strpath, sections=['database']) == {'database': DATA['database']}
+
+
+def test_missing_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = connect(tmpdir.join(CONFIG).strpath, sections=['database'])
+    config['database']['host'] = 'localhost'
+
+    assert connect(tmpdir.join(CONFIG).strpath, sections=['database']) == {'database': {'host': 'localhost'}}
+
+
+def test_lazy(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, sections=['services'], lazy=True)
+
+    assert config['services']['billing']['url'] == 'http://billing'
+
+
+def test_refuses_journal_and_multiprocess_modes(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    with raises(ValueError):
+        connect(config_file.strpath, sections=['database'], journal=True)
+
+    with raises(ValueError):
+        connect(config_file.strpath, sections=['database'], multiprocess=True)
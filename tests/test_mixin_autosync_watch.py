@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# coding=utf-8
+import gc
+import json
+import os
+import time
+
+from pytest import fixture, mark, skip
+
+from json_config import watch
+from json_config.main import connect
+
+parametrize = mark.parametrize
+
+CONFIG = 'config.json'
+
+
+@fixture(params=['inotify', 'polling'])
+def watcher(request):
+    """:type request: _pytest.python.FixtureRequest"""
+    if request.param == 'polling':
+        _watcher = watch.PollingWatcher(interval=0.02)
+    elif watch._load_inotify() is None:
+        skip('inotify is not available')
+    else:
+        _watcher = watch.InotifyWatcher()
+
+    request.addfinalizer(_watcher.close)
+    return _watcher
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write('{"database": {"host": "localhost"}}')
+    return _config_file
+
+
+def edit(config_file, obj):
+    """
+    Replace `config_file` like an editor would, through a temp file.
+
+    :type config_file: py._path.local.LocalPath
+    """
+    temp = config_file.new(basename='.config.json.swp')
+    temp.write(json.dumps(obj))
+    os.rename(temp.strpath, config_file.strpath)
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@parametrize('write', [edit, lambda config_file, obj: config_file.write(json.dumps(obj))])
+def test_reloads_changes_made_elsewhere(config_file, watcher, write):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, watch=watcher)
+
+    write(config_file, {'database': {'host': 'replica'}})
+
+    assert wait_for(lambda: config['database']['host'] == 'replica', timeout=1)
+    assert watcher.stats()['reloads'] == 1
+
+
+def test_ignores_its_own_writes(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, watch=watcher)
+
+    for port in range(5):
+        config['database']['port'] = port
+    time.sleep(0.2)
+
+    assert watcher.stats()['reloads'] == 0
+    assert config['database'] == {'host': 'localhost', 'port': 4}
+
+
+def test_replays_unsaved_changes(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, watch=watcher, save_delay=60)
+    config['database']['port'] = 5432
+    config['database']['port'] = 5433
+
+    edit(config_file, {'database': {'host': 'replica'}, 'cache': {'ttl': 60}})
+
+    assert wait_for(lambda: 'cache' in config)
+    assert config == {'database': {'host': 'replica', 'port': 5433}, 'cache': {'ttl': 60}}
+
+    config.flush()
+    assert json.loads(config_file.read()) == config
+
+
+def test_keeps_the_tree_when_the_file_is_invalid_or_gone(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, watch=watcher)
+
+    config_file.write('{"database": ')
+    assert wait_for(lambda: watcher.stats()['failures'])
+    config_file.remove()
+    time.sleep(0.1)
+
+    assert config == {'database': {'host': 'localhost'}}
+
+
+def test_sections(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, watch=watcher, sections=['database'])
+
+    edit(config_file, {'database': {'host': 'replica'}, 'cache': {'ttl': 60}})
+
+    assert wait_for(lambda: config['database']['host'] == 'replica')
+    assert config == {'database': {'host': 'replica'}}
+
+
+def test_follows_symlinks(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    data_dir = config_file.dirpath().mkdir('data')
+    data_dir.join(CONFIG).write('{"version": 1}')
+    link = config_file.dirpath().mkdir('etc').join(CONFIG)
+    link.mksymlinkto(data_dir.join(CONFIG))
+
+    config = connect(link.strpath, watch=watcher)
+    data_dir.join(CONFIG).write('{"version": 2}')
+
+    assert wait_for(lambda: config['version'] == 2)
+
+
+def test_close_stops_watching(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, watch=watcher)
+    config.close()
+
+    edit(config_file, {})
+    time.sleep(0.1)
+
+    assert watcher.stats() == {'files': 0, 'checks': 0, 'reloads': 0, 'failures': 0}
+    assert config == {'database': {'host': 'localhost'}}
+
+
+def test_unused_configs_are_freed(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    connect(config_file.strpath, watch=watcher)
+    gc.collect()
+
+    edit(config_file, {})
+
+    assert wait_for(lambda: not watcher.stats()['files'])
+    assert not watcher.stats()['checks']
+
+
+def test_inotify_idles(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    if watch._load_inotify() is None:
+        skip('inotify is not available')
+
+    config = connect(config_file.strpath, watch=True)
+    assert isinstance(config.watcher, watch.InotifyWatcher)
+
+    checks = config.watcher.stats()['checks']
+    time.sleep(0.1)
+    assert config.watcher.stats()['checks'] == checks
+    config.close()
+
+
+def test_reload(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath)
+    config_file.write('{"database": {"host": "replica"}}')
+
+    config['database'].reload()
+
+    assert config == {'database': {'host': 'replica'}}
+    assert config_file.read() == '{"database": {"host": "replica"}}'
+
+
+def test_reload_replays_batched_changes(config_file, watcher):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, watch=watcher)
+    with config.batch():
+        config['cache']['ttl'] = 60
+        config_file.write('{"database": {"host": "replica"}}')
+        config.reload()
+
+        assert config == {'database': {'host': 'replica'}, 'cache': {'ttl': 60}}
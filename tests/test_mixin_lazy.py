@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+
+from pytest import fixture
+
+from json_config.main import AutoDict, connect
+
+CONFIG = 'config.json'
+DATA = {
+    'database': {'host': 'localhost', 'ports': [5432, 5433], 'replica': {'host': 'replica'}},
+    'cache': {'ttl': 60},
+    'name': 'service',
+}
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write(json.dumps(DATA))
+    return _config_file
+
+
+@fixture
+def config(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    return connect(config_file.strpath, lazy=True)
+
+
+def is_raw(node, key):
+    return type(dict.__getitem__(node, key)) is dict
+
+
+def test_nested_dicts_are_not_wrapped_on_load(config):
+    assert is_raw(config, 'database')
+    assert is_raw(config, 'cache')
+
+
+def test_access_wraps_one_level(config):
+    database = config['database']
+
+    assert isinstance(database, AutoDict)
+    assert database._parent is config
+    assert database._key == 'database'
+    assert is_raw(database, 'replica')
+    assert is_raw(config, 'cache')
+
+
+def test_every_read_hands_out_nodes(config):
+    assert isinstance(config.get('database'), AutoDict)
+    assert all(isinstance(value, AutoDict) for value in config.values() if isinstance(value, dict))
+    assert all(isinstance(value, AutoDict) for _, value in config.items() if isinstance(value, dict))
+    assert config.get('missing') is None
+
+    cache = config.pop('cache')
+    assert isinstance(cache, AutoDict)
+    assert cache == {'ttl': 60}
+
+
+def test_copies_hold_nodes(config, config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    copy = dict(config)
+    assert isinstance(copy['cache'], AutoDict)
+    assert isinstance(dict(**config)['database'], AutoDict)
+
+    # a change made through the copy is the config's own, as with eager configs: cached and saved, never silent
+    config.serialize()
+    copy['cache']['ttl'] = 0
+    assert json.loads(config.serialize())['cache'] == {'ttl': 0}
+    assert json.loads(config_file.read())['cache'] == {'ttl': 0}
+
+
+def test_repr_does_not_wrap(config):
+    assert repr(config).startswith('Connect(')
+    assert is_raw(config, 'database')
+
+
+def test_matches_eager_loading(config, config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    eager = connect(config_file.strpath)
+
+    assert config == eager == DATA
+    assert config.serialize() == eager.serialize()
+
+    config['database']['replica']['port'] = 5434
+    eager['database']['replica']['port'] = 5434
+    assert config.serialize() == eager.serialize()
+    assert json.loads(config_file.read())['database']['replica'] == {'host': 'replica', 'port': 5434}
+
+
+def test_lists_handed_out_after_serializing_are_seen(config):
+    config.serialize()
+
+    config['database']['ports'].append(5434)
+
+    assert json.loads(config.serialize())['database']['ports'] == [5432, 5433, 5434]
+
+
+def test_assigned_dicts_are_copied(config):
+    value = {'nested': {'key': 'value'}}
+    config['new'] = value
+
+    value['nested']['key'] = 'changed'
+
+    assert config['new']['nested']['key'] == 'value'
+    assert not is_raw(config['new'], 'nested')
+
+
+def test_journal_replays_into_lazy_configs(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, lazy=True, journal=True)
+    config['database']['replica']['port'] = 5434
+    del config['cache']['ttl']
+
+    reloaded = connect(config_file.strpath, lazy=True, journal=True)
+
+    assert reloaded == config
+    assert is_raw(reloaded, 'database')
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 # coding=utf-8
+import json
 from textwrap import dedent
 
 from pytest import fixture
@@ -139,3 +140,90 @@ def test_serializer_sanity(pretty):
 
     assert serialized1 == serialized2
     assert deserialized1 == deserialized2
+
+
+def test_serialize_reuses_fragments_of_unchanged_branches(pretty, mocker):
+    """:type mocker: pytest_mock.MockFixture"""
+    pretty.serialize()
+    dumps = mocker.spy(pretty.codec, 'dumps')
+
+    pretty['this']['is']['a']['test'] = 'changed'
+    result = pretty.serialize()
+
+    # only the changed spine is re-encoded: root, this, is, a
+    assert dumps.call_count == 4
+    assert result == json.dumps(dict(pretty), indent=2, sort_keys=True, separators=(',', ': '))
+
+
+def test_serialize_matches_json_after_every_kind_of_change(pretty):
+    def expected(**options):
+        options.setdefault('indent', 2)
+        options.setdefault('sort_keys', True)
+        options.setdefault('separators', (',', ': '))
+        return json.dumps(dict(pretty), **options)
+
+    pretty.serialize()
+
+    pretty['this']['is']['a']['test'] = 'changed'
+    assert pretty.serialize() == expected()
+
+    del pretty['this']['is']['not']
+    assert pretty.serialize() == expected()
+
+    pretty['this']['is']['a'].pop('different')
+    assert pretty.serialize() == expected()
+
+    pretty.setdefault('new', {'nested': ['list']})
+    assert pretty.serialize() == expected()
+    assert pretty.serialize(indent=4) == expected(indent=4)
+
+    pretty['new'].clear()
+    assert pretty.serialize() == expected()
+
+
+def test_serialize_does_not_cache_mutable_values(pretty):
+    pretty['this']['is']['a']['list'] = [1, 2]
+    pretty.serialize()
+
+    pretty['this']['is']['a']['list'].append(3)
+
+    assert pretty.deserialize(pretty.serialize())['this']['is']['a']['list'] == [1, 2, 3]
+
+
+def test_serialize_keeps_strings_that_look_like_placeholders(pretty):
+    pretty['s'] = '\x00json_config:0\x00'
+    pretty['t'] = {'x': 1}
+    pretty['u'] = '\x00json_config:%016x:0\x00' % 0
+
+    assert pretty.deserialize(pretty.serialize()) == json.loads(json.dumps(pretty))
+
+
+def test_assigning_a_node_elsewhere_copies_it(pretty):
+    pretty.serialize()
+
+    pretty['copy'] = pretty['this']
+    pretty['this']['is']['a']['test'] = 'changed'
+
+    assert pretty['copy']['is']['a']['test'] == 'success'
+    assert pretty.deserialize(pretty.serialize())['copy']['is']['a']['test'] == 'success'
+
+
+def test_serialize_leaves_out_empty_vivified_branches(pretty):
+    pretty.serialize()
+
+    if pretty['features']['beta']['enabled']:
+        pass
+    pretty['completely'].clear()
+
+    assert pretty.deserialize(pretty.serialize()) == {'this': pretty['this']}
+
+    pretty['features']['beta']['enabled'] = True
+    assert pretty.deserialize(pretty.serialize())['features'] == {'beta': {'enabled': True}}
+
+
+def test_serialize_keeps_assigned_empty_dicts(pretty):
+    pretty['empty'] = {}
+    pretty['completely'] = {}
+
+    assert pretty.deserialize(pretty.serialize())['empty'] == {}
+    assert pretty.deserialize(pretty.serialize())['completely'] == {}
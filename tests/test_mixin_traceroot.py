@@ -21,3 +21,15 @@ def test_can_find_its_root():
 
     assert sample is sample
     assert sample['this']['is']['a']._root is sample
+
+
+# noinspection PyProtectedMember
+def test_nodes_keep_their_state_in_slots():
+    sample = AutoDict()
+
+    sample['this']['is']['a']['test'] = 'success'
+    node = sample['this']['is']
+
+    assert node._root_ is sample
+    assert node._parent_ is sample['this']
+    assert node._key == 'is'
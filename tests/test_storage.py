@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# coding=utf-8
+import os
+import stat
+
+from pytest import raises, mark
+
+from json_config import storage
+from json_config.main import connect
+
+skipif = mark.skipif
+
+
+def test_atomic_write_replaces_contents(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = tmpdir.join('config.json')
+    config.write('old')
+
+    storage.write_atomic(config.strpath, 'new')
+
+    assert config.read() == 'new'
+    assert tmpdir.listdir() == [config]
+
+
+def test_atomic_write_creates_missing_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = tmpdir.join('config.json')
+
+    storage.write_atomic(config.strpath, 'new')
+
+    assert config.read() == 'new'
+
+
+@skipif(os.name != 'posix', reason='posix permissions')
+def test_atomic_write_preserves_file_mode(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = tmpdir.join('config.json')
+    config.write('old')
+    os.chmod(config.strpath, 0o640)
+
+    storage.write_atomic(config.strpath, 'new')
+
+    assert stat.S_IMODE(os.stat(config.strpath).st_mode) == 0o640
+
+
+def test_failed_atomic_write_leaves_original_untouched(tmpdir, mocker):
+    """
+    :type tmpdir: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = tmpdir.join('config.json')
+    config.write('old')
+    mocker.patch('json_config.storage.replace', side_effect=OSError)
+
+    with raises(OSError):
+        storage.write_atomic(config.strpath, 'new')
+
+    assert config.read() == 'old'
+    assert tmpdir.listdir() == [config]
+
+
+# noinspection PyUnresolvedReferences
+def test_fsync_policies(tmpdir, mocker):
+    """
+    :type tmpdir: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config = tmpdir.join('config.json').strpath
+    fsync = mocker.spy(os, 'fsync')
+
+    storage.write_atomic(config, 'none', fsync='none')
+    assert fsync.call_count == 0
+
+    storage.write_atomic(config, 'file', fsync='file')
+    assert fsync.call_count == 1
+
+    fsync.reset_mock()
+    storage.write_atomic(config, 'file+dir', fsync='file+dir')
+    assert fsync.call_count == 2
+
+
+def test_connect_accepts_save_options(tmpdir, mocker):
+    """
+    :type tmpdir: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    write_in_place = mocker.patch('json_config.main.write_in_place')
+
+    config = connect(tmpdir.join('config.json').strpath, atomic_save=False, fsync_policy='file')
+    config['test'] = 'success'
+
+    assert write_in_place.call_count == 1
+    assert write_in_place.call_args[0][2] == 'file'
+
+
+def test_connect_rejects_unknown_fsync_policy(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+
+    with raises(ValueError):
+        connect(tmpdir.join('config.json').strpath, fsync_policy='always')
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# coding=utf-8
+import io
+import json
+import os
+
+from pytest import fixture, mark, raises
+
+from json_config.main import AutoDict, _wrap_loaded, connect
+from json_config.streaming import load_into
+from tests.utils import dir_tests
+
+parametrize = mark.parametrize
+
+CONFIG = 'config.json'
+SAMPLE_CONFIG_LARGE = 'sample_assets/sample_config_large.json'
+
+DATA = {
+    'database': {'host': 'localhost', 'ports': [5432, 5433], 'replica': {'host': 'replica', 'weight': 0.5}},
+    'servers': [{'name': 'a', 'tags': {'role': 'web'}}, {'name': 'bé\\"', 'tags': {}}],
+    'flags': {'beta': True, 'legacy': False, 'owner': None},
+    'big': 12345678901234567890,
+    'small': -1.5e-10,
+    'empty': {},
+}
+
+
+def plain(parent, key, obj, memo):
+    return obj
+
+
+def load(text, chunk_size):
+    root = {}
+    load_into(io.StringIO(text), root, plain, chunk_size)
+    return root
+
+
+@parametrize('indent', [None, 2])
+@parametrize('chunk_size', [1, 2, 3, 7, 64, 1 << 16])
+def test_decodes_like_json(indent, chunk_size):
+    text = json.dumps(DATA, indent=indent)
+
+    assert load(text, chunk_size) == json.loads(text)
+
+
+@parametrize('chunk_size', [1, 5, 1 << 16])
+def test_decodes_the_sample_config(chunk_size):
+    with open(dir_tests(SAMPLE_CONFIG_LARGE)) as f:
+        text = f.read()
+
+    assert load(text, chunk_size) == json.loads(text)
+
+
+def test_floats_cut_at_any_chunk_boundary():
+    text = json.dumps(dict(('key_%d' % i, [i * 1.25, -i / 3.0, i * 1e17, -i * 2.5e-12]) for i in range(300)))
+    expected = json.loads(text)
+
+    for chunk_size in range(200, 1200, 7):
+        assert load(text, chunk_size) == expected
+
+
+@parametrize('text', ['{"a": 1,}', '{"a" 1}', '[1]', '{"a": [1,]}', '{"a": 1} x', '{"a": tru}', '{"a": "x', '{'])
+def test_rejects_invalid_json(text):
+    with raises(ValueError):
+        load(text, 2)
+
+
+def test_wraps_objects_but_not_dicts_in_lists():
+    wrapped = []
+
+    def wrap(parent, key, obj, memo):
+        wrapped.append(key)
+        return obj
+
+    load_into(io.StringIO(json.dumps(DATA)), {}, wrap, 4)
+
+    assert sorted(wrapped) == ['database', 'empty', 'flags', 'replica']
+
+
+@parametrize('lazy', [False, True])
+def test_shares_equal_keys(lazy):
+    root = connect(None, lazy=lazy)
+    text = json.dumps({'a': {'host': 1}, 'b': {'host': 2}})
+
+    load_into(io.StringIO(text), root, _wrap_loaded)
+
+    key_a, = dict.__getitem__(root, 'a')
+    key_b, = dict.__getitem__(root, 'b')
+    assert key_a is key_b
+
+
+@fixture
+def config_file(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    _config_file = tmpdir.join(CONFIG)
+    _config_file.write(json.dumps(DATA, indent=2))
+    return _config_file
+
+
+# noinspection PyProtectedMember
+def test_connect_streams_into_nodes(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, streaming=True)
+
+    assert config == DATA
+    assert isinstance(config['database']['replica'], AutoDict)
+    assert config['database']['replica']._parent is config['database']
+    assert config['database']['replica']._root is config
+    assert type(config['servers'][0]) is dict
+    assert config.serialize() == connect(config_file.strpath).serialize()
+
+
+def test_connect_streams_lazily(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, streaming=True, lazy=True)
+
+    assert type(dict.__getitem__(config, 'database')) is dict
+    assert config == DATA
+
+
+def test_streams_missing_files(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = connect(tmpdir.join(CONFIG).strpath, streaming=True)
+    config['key'] = 'value'
+
+    assert connect(tmpdir.join(CONFIG).strpath, streaming=True) == {'key': 'value'}
+
+
+def test_streaming_replays_the_journal(config_file):
+    """:type config_file: py._path.local.LocalPath"""
+    config = connect(config_file.strpath, journal=True)
+    config['database']['replica']['host'] = 'other'
+    del config['flags']['legacy']
+    config['servers'] = []
+
+    reloaded = connect(config_file.strpath, journal=True, streaming=True)
+
+    assert reloaded == config
+    assert not reloaded._pending_
+    assert os.path.exists(reloaded.journal_file)
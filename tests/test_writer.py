@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# coding=utf-8
+import json
+import threading
+
+from pytest import fixture, raises
+
+from json_config.main import connect
+from json_config.writer import BackgroundWriter
+
+
+@fixture
+def writer(request):
+    """:type request: _pytest.python.FixtureRequest"""
+    _writer = BackgroundWriter()
+    request.addfinalizer(_writer.close)
+    return _writer
+
+
+@fixture
+def gate(request):
+    """
+    Block the writer thread until set.
+
+    :type request: _pytest.python.FixtureRequest
+    """
+    _gate = threading.Event()
+    request.addfinalizer(_gate.set)
+    return _gate
+
+
+def block(writer, gate):
+    """Occupy `writer`'s thread until `gate` is set."""
+    started = threading.Event()
+    writer.submit('blocker', lambda: (started.set(), gate.wait()))
+    started.wait(1)
+
+
+def test_writes_run_on_the_writer_thread(writer):
+    threads = []
+
+    writer.submit('key', lambda: threads.append(threading.current_thread()))
+
+    assert writer.flush()
+    assert threads and threads[0] is not threading.current_thread()
+
+
+def test_queued_writes_for_the_same_key_are_coalesced(writer, gate):
+    written = []
+    block(writer, gate)
+
+    for i in range(10):
+        writer.submit('key', written.append, i)
+
+    assert writer.depth == 1
+    gate.set()
+    writer.flush()
+
+    assert written == [9]
+    assert writer.stats()['coalesced'] == 9
+    assert writer.stats()['writes'] == 2
+
+
+def test_submit_blocks_when_the_queue_is_full(gate):
+    writer = BackgroundWriter(max_pending=1)
+    block(writer, gate)
+    writer.submit('first', lambda: None)
+
+    submitted = threading.Event()
+    thread = threading.Thread(target=lambda: (writer.submit('second', lambda: None), submitted.set()))
+    thread.start()
+
+    assert not submitted.wait(0.1)
+    gate.set()
+    assert submitted.wait(1)
+
+    writer.close()
+    assert writer.stats()['blocked'] == 1
+
+
+def test_flush_times_out(writer, gate):
+    writer.submit('key', gate.wait)
+
+    assert writer.flush('key', timeout=0.05) is False
+
+    gate.set()
+    assert writer.flush('key', timeout=1) is True
+
+
+def test_flush_raises_failed_writes(writer):
+    def fail():
+        raise IOError('disk full')
+
+    writer.submit('key', fail)
+
+    with raises(IOError):
+        writer.flush('key')
+
+    assert writer.stats()['failures'] == 1
+
+
+def test_stats_report_latency(writer):
+    writer.submit('key', lambda: None)
+    writer.flush()
+
+    stats = writer.stats()
+    assert stats['depth'] == 0
+    assert stats['max_depth'] == 1
+    assert 0 < stats['avg_latency'] <= stats['max_latency']
+
+
+def test_config_saves_through_the_writer(writer, gate, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config_file = tmpdir.join('config.json')
+    config = connect(config_file.strpath, background=writer)
+    block(writer, gate)
+
+    config['this']['is']['a']['test'] = 'success'
+    config['another'] = 'test'
+    assert not config_file.exists()
+
+    gate.set()
+    assert config.flush(timeout=1)
+
+    assert json.loads(config_file.read()) == {'this': {'is': {'a': {'test': 'success'}}}, 'another': 'test'}
+    assert writer.stats()['coalesced'] == 1
+
+
+def test_closed_config_saves_synchronously(writer, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config_file = tmpdir.join('config.json')
+    config = connect(config_file.strpath, background=writer)
+
+    assert config.close()
+    config['test'] = 'success'
+
+    assert json.loads(config_file.read()) == {'test': 'success'}
+
+
+def test_background_and_journal_are_exclusive(tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    with raises(ValueError):
+        connect(tmpdir.join('config.json').strpath, background=True, journal=True)
+
+
+def test_failed_background_writes_stay_pending(writer, tmpdir, mocker):
+    """
+    :type tmpdir: py._path.local.LocalPath
+    :type mocker: pytest_mock.MockFixture
+    """
+    config_file = tmpdir.join('config.json')
+    config = connect(config_file.strpath, background=writer)
+    write_atomic = mocker.patch('json_config.main.write_atomic', side_effect=IOError('disk full'))
+
+    config['test'] = 'success'
+    with raises(IOError):
+        config.flush()
+
+    assert config._dirty_
+    write_atomic.side_effect = None
+    mocker.stopall()
+
+    assert config.flush()
+    assert not config._dirty_
+    assert json.loads(config_file.read()) == {'test': 'success'}
+
+
+def test_close_keeps_the_writer_when_the_flush_times_out(writer, gate, tmpdir):
+    """:type tmpdir: py._path.local.LocalPath"""
+    config = connect(tmpdir.join('config.json').strpath, background=writer)
+    block(writer, gate)
+    config['test'] = 'success'
+
+    assert config.close(timeout=0.05) is False
+    assert config.writer is writer
+
+    gate.set()
+    assert config.close(timeout=1)
+    assert config.writer is None